@@ -7,6 +7,7 @@ __all__ = [
     "parsers",
     "scraper",
     "excel_writer",
+    "id_index",
     "cli",
     "ollama_embeddings",
     "llm",
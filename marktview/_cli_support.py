@@ -0,0 +1,98 @@
+"""Lightweight command-line helpers that only depend on the standard library.
+
+Keeping them apart from :mod:`marktview.cli` allows ``--help`` and ``--clear``
+to run without importing Playwright.
+"""
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+from . import config
+from .excel_writer import delta_path
+from .id_index import index_path
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Markt.de Listings Scraper")
+    parser.add_argument(
+        "--start-url",
+        default=config.START_URL,
+        help="Start URL für die Suche",
+    )
+    parser.add_argument(
+        "--output",
+        default=config.OUTPUT_FILE,
+        help="Ausgabedatei für Excel (xlsx)",
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=config.MAX_PAGES,
+        help="Maximale Anzahl an Ergebnisseiten",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=config.CONCURRENCY,
+        help="Anzahl gleichzeitiger Detailabrufe (z. B. --concurrency 32)",
+    )
+    parser.add_argument(
+        "--headless",
+        action=argparse.BooleanOptionalAction,
+        default=config.HEADLESS,
+        help="Browser im Headless-Modus starten",
+    )
+    parser.add_argument(
+        "--user-data-dir",
+        default=config.USER_DATA_DIR,
+        help=(
+            "Profilverzeichnis für einen persistenten Browser-Kontext "
+            "(z. B. .pw-profile); Cookies und Cache bleiben erhalten"
+        ),
+    )
+    parser.add_argument(
+        "--loop",
+        action="store_true",
+        help=(
+            f"Alle {config.LOOP_INTERVAL / 60:g} Minuten erneut ausführen, "
+            "bis Strg+C gedrückt wird"
+        ),
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Logs und aktuelle Ausgabedatei löschen, ohne zu scrapen",
+    )
+    return parser
+
+
+def parse_args() -> argparse.Namespace:
+    return build_parser().parse_args()
+
+
+def configure_utf8_output() -> None:
+    """Ensure stdout/stderr use UTF-8 encoding.
+
+    This prevents ``UnicodeEncodeError`` when console code pages do not
+    support characters used in listing titles (e.g., emojis on Windows).
+    """
+
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.reconfigure(encoding="utf-8")  # type: ignore[attr-defined]
+        except AttributeError:
+            # ``reconfigure`` not available (e.g., when stream is replaced).
+            pass
+
+
+def clear_artifacts(output_path: Path, log_dir: Path) -> None:
+    if output_path.exists():
+        output_path.unlink()
+    index_path(output_path).unlink(missing_ok=True)
+    delta_path(output_path).unlink(missing_ok=True)
+
+    # Entfernt das Log-Verzeichnis samt Inhalt; Fehler (z. B. gesperrte
+    # Dateien) werden ignoriert.
+    shutil.rmtree(log_dir, ignore_errors=True)
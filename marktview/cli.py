@@ -4,77 +4,47 @@ import argparse
 import asyncio
 import inspect
 import logging
+import os
+import signal
 import sys
 from pathlib import Path
 
-from playwright.async_api import async_playwright
-
 from . import config
-from .excel_writer import load_existing_listing_ids, write_listings_to_excel
-from .llm import configure_llm_logging
-from .scraper import scrape_pages
+from ._cli_support import (  # noqa: F401 - re-exported for callers
+    build_parser,
+    clear_artifacts,
+    configure_utf8_output,
+    parse_args,
+)
 
+logger = logging.getLogger(__name__)
 
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Markt.de Listings Scraper")
-    parser.add_argument(
-        "--start-url",
-        default=config.START_URL,
-        help="Start URL für die Suche",
-    )
-    parser.add_argument(
-        "--output",
-        default=config.OUTPUT_FILE,
-        help="Ausgabedatei für Excel (xlsx)",
-    )
-    parser.add_argument(
-        "--max-pages",
-        type=int,
-        default=config.MAX_PAGES,
-        help="Maximale Anzahl an Ergebnisseiten",
-    )
-    parser.add_argument(
-        "--concurrency",
-        type=int,
-        default=config.CONCURRENCY,
-        help="Anzahl gleichzeitiger Detailabrufe",
-    )
-    parser.add_argument(
-        "--headless",
-        action=argparse.BooleanOptionalAction,
-        default=config.HEADLESS,
-        help="Browser im Headless-Modus starten",
-    )
-    parser.add_argument(
-        "--loop",
-        action="store_true",
-        help="Alle 5 Minuten erneut ausführen, bis Strg+C gedrückt wird",
-    )
-    parser.add_argument(
-        "--clear",
-        action="store_true",
-        help="Logs und aktuelle Ausgabedatei löschen, ohne zu scrapen",
-    )
-    return parser
 
+def _playwright():
+    """Return the Playwright context manager, importing Playwright lazily."""
 
-def parse_args() -> argparse.Namespace:
-    return build_parser().parse_args()
+    from playwright.async_api import async_playwright
 
+    return async_playwright()
 
-def configure_utf8_output() -> None:
-    """Ensure stdout/stderr use UTF-8 encoding.
 
-    This prevents ``UnicodeEncodeError`` when console code pages do not
-    support characters used in listing titles (e.g., emojis on Windows).
+def install_uvloop() -> bool:
+    """Use uvloop as event loop implementation when it is available.
+
+    uvloop is an optional dependency and does not support Windows; the
+    default asyncio loop is kept whenever it cannot be used.
     """
 
-    for stream in (sys.stdout, sys.stderr):
-        try:
-            stream.reconfigure(encoding="utf-8")  # type: ignore[attr-defined]
-        except AttributeError:
-            # ``reconfigure`` not available (e.g., when stream is replaced).
-            pass
+    if sys.platform == "win32":
+        return False
+
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
 
 
 async def close_playwright_resource(resource: object) -> None:
@@ -85,17 +55,99 @@ async def close_playwright_resource(resource: object) -> None:
             await maybe_coro
 
 
+async def open_browser(
+    playwright,
+    *,
+    headless: bool,
+    resources: list[object],
+    user_data_dir: str | Path | None = None,
+) -> object:
+    """Launch Chromium with a fresh context and register both for cleanup.
+
+    With ``user_data_dir`` a persistent context is launched instead. Cookies
+    and the HTTP cache then survive between runs; as there is no separate
+    browser object, ``None`` takes its place in ``resources``.
+    """
+
+    if user_data_dir is not None:
+        context = await playwright.chromium.launch_persistent_context(
+            os.fspath(user_data_dir), headless=headless
+        )
+        resources.extend([context, None])
+        return context
+
+    browser = await playwright.chromium.launch(headless=headless)
+    context = await browser.new_context()
+    resources.extend([context, browser])
+    return context
+
+
+async def close_resources(resources: list[object]) -> None:
+    for resource in reversed(resources):
+        await close_playwright_resource(resource)
+    resources.clear()
+
+
+async def recycle_context(resources: list[object]) -> object:
+    """Replace the live context with a fresh one that keeps cookies/storage.
+
+    Long-lived contexts accumulate memory; recreating the context is much
+    cheaper than relaunching the browser.
+    """
+
+    context, browser = resources[-2:]
+    if browser is None:
+        # Persistente Kontexte lassen sich nicht neu erzeugen, ohne das
+        # Profil zu schließen – sie bleiben bestehen.
+        return context
+
+    state = await context.storage_state()
+    await close_playwright_resource(context)
+    new_context = await browser.new_context(storage_state=state)
+    resources[-2] = new_context
+    return new_context
+
+
 async def scrape_cycle(
     playwright,
     args: argparse.Namespace,
     output_path: Path,
+    known_listing_ids: set[str] | None = None,
+    resources: list[object] | None = None,
+    delta_path: Path | None = None,
+    detail_contexts: list[object] | None = None,
 ) -> Path:
-    existing_listing_ids = load_existing_listing_ids(output_path)
-    resources: list[object] = []
+    """Run one scraping pass.
+
+    Without ``resources`` a browser is launched for this pass only. Callers
+    that run several passes hand in the resources of an already opened
+    browser so that Chromium is started only once. With ``delta_path`` the
+    new listings are appended to that CSV file instead of the workbook.
+    Either way ``scrape_pages`` writes them as its progress file, so no
+    second write of the result follows. ``detail_contexts`` is handed on to
+    ``scrape_pages`` as its long-lived detail page pool.
+    """
 
-    browser = await playwright.chromium.launch(headless=args.headless)
-    context = await browser.new_context()
-    resources.extend([context, browser])
+    from .excel_writer import load_existing_listing_ids, write_listings_to_excel
+    from .scraper import scrape_pages
+
+    if known_listing_ids is None:
+        known_listing_ids = load_existing_listing_ids(output_path)
+
+    owns_browser = resources is None
+    if resources is None:
+        resources = []
+        await open_browser(
+            playwright,
+            headless=args.headless,
+            resources=resources,
+            user_data_dir=args.user_data_dir,
+        )
+
+    # ``scrape_pages`` appends a new (context, browser) pair when it switches
+    # to the hidden headless browser – the last pair is always the live one.
+    context = resources[-2]
+    browser_hidden = args.headless or len(resources) > 2
 
     try:
         listings = await scrape_pages(
@@ -103,64 +155,155 @@ async def scrape_cycle(
             args.start_url,
             max_pages=args.max_pages,
             concurrency_limit=args.concurrency,
-            known_listing_ids=existing_listing_ids,
-            progress_path=output_path,
+            known_listing_ids=known_listing_ids,
+            progress_path=delta_path or output_path,
             playwright=playwright,
-            start_headless=args.headless,
+            start_headless=browser_hidden,
             resources=resources,
+            detail_contexts=detail_contexts,
         )
 
-        return write_listings_to_excel(listings, output_path)
+        if delta_path is not None:
+            # ``scrape_pages`` hat jede Seite bereits an die Delta-Datei angehängt.
+            return delta_path
+
+        # Die Anzeigen stehen bereits in der Excel-Datei; ohne neue Anzeigen
+        # entsteht hier nur die leere Tabelle mit Kopfzeile.
+        if not output_path.exists():
+            write_listings_to_excel(listings, output_path)
+        return output_path
     finally:
-        for resource in reversed(resources):
-            await close_playwright_resource(resource)
+        if owns_browser:
+            await close_resources(resources)
 
 
-async def run_once(args: argparse.Namespace) -> Path:
-    output_path = Path(args.output)
+async def prepare_llm() -> None:
+    """Let the local LLM start and download its model while the browser opens."""
 
-    async with async_playwright() as playwright:
-        return await scrape_cycle(playwright, args, output_path)
+    from .llm import prepare_default_client
 
+    await asyncio.to_thread(prepare_default_client)
 
-async def run_loop(args: argparse.Namespace) -> None:
-    output_path = Path(args.output)
 
-    async with async_playwright() as playwright:
-        while True:
-            await scrape_cycle(playwright, args, output_path)
-            print("Erneuter Durchlauf in 5 Minuten. Abbruch mit Strg+C.")
-            await asyncio.sleep(300)
+async def wait_for_next_cycle(stop: asyncio.Event, timeout: float) -> bool:
+    """Wait up to ``timeout`` seconds; return ``True`` when a stop was requested.
 
+    While waiting, Ctrl+C only sets ``stop`` so the loop ends immediately and
+    cleanly instead of sleeping out the remaining interval.
+    """
 
-def clear_artifacts(output_path: Path, log_dir: Path) -> None:
-    if output_path.exists():
-        output_path.unlink()
+    loop = asyncio.get_running_loop()
+    try:
+        previous_handler = signal.signal(
+            signal.SIGINT, lambda *_: loop.call_soon_threadsafe(stop.set)
+        )
+    except ValueError:  # pragma: no cover - not running in the main thread
+        previous_handler = None
 
-    if log_dir.exists():
-        for log_file in log_dir.iterdir():
-            if log_file.is_file():
-                log_file.unlink()
-        # Entferne leeres Verzeichnis, falls möglich
+    try:
+        await asyncio.wait_for(stop.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        if previous_handler is not None:
+            signal.signal(signal.SIGINT, previous_handler)
+
+    return stop.is_set()
+
+
+async def run_once(
+    args: argparse.Namespace, output_path: Path | None = None
+) -> Path:
+    if output_path is None:
+        output_path = Path(args.output)
+
+    await prepare_llm()
+    async with _playwright() as playwright:
+        return await scrape_cycle(playwright, args, output_path)
+
+
+async def run_loop(
+    args: argparse.Namespace, output_path: Path | None = None
+) -> None:
+    from .excel_writer import delta_path, flush_csv_to_xlsx, load_existing_listing_ids
+    from .scraper import close_detail_contexts, open_detail_contexts
+
+    if output_path is None:
+        output_path = Path(args.output)
+    csv_path = delta_path(output_path)
+    # Reste eines abgebrochenen Laufs zuerst in die Excel-Datei übernehmen.
+    flush_csv_to_xlsx(csv_path, output_path)
+    # Die bekannten Anzeigenkennungen werden nur einmal aus der Excel-Datei
+    # gelesen und anschließend über alle Durchläufe hinweg fortgeschrieben.
+    known_listing_ids = load_existing_listing_ids(output_path)
+    resources: list[object] = []
+    detail_contexts: list[object] = []
+    await prepare_llm()
+
+    async with _playwright() as playwright:
+        # Browser und Kontext bleiben für alle Durchläufe geöffnet.
+        context = await open_browser(
+            playwright,
+            headless=args.headless,
+            resources=resources,
+            user_data_dir=args.user_data_dir,
+        )
+        stop = asyncio.Event()
         try:
-            log_dir.rmdir()
-        except OSError:  # pragma: no cover - non-empty directory
-            # Verzeichnis ist nicht leer oder konnte nicht entfernt werden
-            pass
+            # Ebenso der Kontextpool für die Detailseiten; neu aufgebaut wird
+            # er nur beim Erneuern des Kontexts oder beim Headless-Wechsel.
+            detail_contexts[:] = await open_detail_contexts(context, args.concurrency)
+            cycle = 0
+            while True:
+                if cycle and cycle % config.CONTEXT_RECYCLE_AFTER == 0:
+                    logger.info("Erneuere Browser-Kontext nach %s Durchläufen.", cycle)
+                    await close_detail_contexts(detail_contexts)
+                    context = await recycle_context(resources)
+                    detail_contexts[:] = await open_detail_contexts(
+                        context, args.concurrency
+                    )
+                cycle += 1
+                await scrape_cycle(
+                    playwright,
+                    args,
+                    output_path,
+                    known_listing_ids,
+                    resources,
+                    delta_path=csv_path,
+                    detail_contexts=detail_contexts,
+                )
+                if cycle % config.EXCEL_FLUSH_AFTER == 0:
+                    flush_csv_to_xlsx(
+                        csv_path, output_path, existing_ids=known_listing_ids
+                    )
+                logger.info(
+                    "Erneuter Durchlauf in %g Minuten. Abbruch mit Strg+C.",
+                    config.LOOP_INTERVAL / 60,
+                )
+                if await wait_for_next_cycle(stop, config.LOOP_INTERVAL):
+                    logger.info("Loop beendet.")
+                    break
+        finally:
+            await close_detail_contexts(detail_contexts)
+            await close_resources(resources)
+            flush_csv_to_xlsx(csv_path, output_path, existing_ids=known_listing_ids)
 
 
 def main() -> None:
     args = parse_args()
 
+    output_path = Path(args.output)
     log_dir = Path("log")
 
     configure_utf8_output()
 
     if args.clear:
-        clear_artifacts(Path(args.output), log_dir)
+        clear_artifacts(output_path, log_dir)
         print("Logs und Ausgabedatei wurden gelöscht.")
         return
 
+    from .llm import configure_llm_logging
+
     log_dir.mkdir(parents=True, exist_ok=True)
     configure_llm_logging(log_dir)
 
@@ -174,13 +317,15 @@ def main() -> None:
         force=True,
     )
 
+    install_uvloop()
+
     try:
         if args.loop:  # pragma: no cover - manual loop mode
-            asyncio.run(run_loop(args))
+            asyncio.run(run_loop(args, output_path))
         else:
-            asyncio.run(run_once(args))
+            asyncio.run(run_once(args, output_path))
     except KeyboardInterrupt:  # pragma: no cover - user interruption path
-        print("Loop beendet.")
+        logger.info("Loop beendet.")
 
 
 if __name__ == "__main__":  # pragma: no cover - entrypoint
@@ -3,7 +3,27 @@
 START_URL = "https://erotik.markt.de/74670-forchtenberg/anzeigen/fetisch/?radius=100"
 OUTPUT_FILE = "anzeigen.xlsx"
 MAX_PAGES = 50
-CONCURRENCY = 2
+# Obergrenze gleichzeitiger Detailabrufe; ``scrape_pages`` hält dafür einen
+# Pool aus ebenso vielen Detailseiten.
+CONCURRENCY = 16
 HEADLESS = False
+USER_DATA_DIR = None
 NETWORK_IDLE_DELAY = 1.0
 PAGE_READY_DELAY = 2.0
+CONTEXT_RECYCLE_AFTER = 50
+# Ressourcentypen, die der Browser gar nicht erst lädt; ausgelesen wird nur Text.
+# Abgefangen werden nur URLs mit den Dateiendungen dieser Typen, alle übrigen
+# Anfragen (auch Bilder ohne Dateiendung) laufen nicht über Python. Solange
+# eine Route aktiv ist, nutzt Chromium aber keinen HTTP-Cache und ruft alles
+# neu ab. Mit persistentem Profil (``--user-data-dir``) wird deshalb nichts
+# blockiert und der Cache bleibt wirksam. Eine leere Menge schaltet das
+# Blockieren ganz ab.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+BLOCKED_RESOURCE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "mp3", "ogg", "wav", "m4a"),
+}
+LOOP_INTERVAL = 300.0
+EXCEL_FLUSH_AFTER = 12
+PROGRESS_FLUSH_AFTER = 50
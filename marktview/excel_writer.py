@@ -1,12 +1,20 @@
-"""Excel export helpers for Markt.de listings."""
+"""Excel export helpers for Markt.de listings.
 
+openpyxl is imported inside the functions that need it so that importing
+this module (e.g. for ``--clear`` or ``--help``) stays cheap.
+"""
+
+import csv
+import logging
+import os
+import sys
 from pathlib import Path
-from typing import Iterable, Set
+from typing import Iterable, Iterator, Set
 
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Alignment
+from . import id_index
+from .models import NOT_SPECIFIED, Listing
 
-from .models import Listing
+logger = logging.getLogger(__name__)
 
 
 HEADERS = [
@@ -22,61 +30,102 @@ HEADERS = [
     "Benutzername",
 ]
 
+BODY_COLUMN = HEADERS.index("Text")
+LISTING_ID_COLUMN = HEADERS.index("Anzeigenkennung")
+BODY_STYLE = "wrap_body"
+COLUMN_WIDTHS = (
+    ("A", 40),
+    ("B", 80),
+    ("C", 10),
+    ("D", 20),
+    ("E", 100),
+    ("F", 20),
+    ("G", 20),
+    ("H", 20),
+    ("I", 20),
+    ("J", 30),
+)
+
+
+def _is_listing_id(value: object) -> bool:
+    """Return whether ``value`` is a real ID and not the missing-ID placeholder."""
+
+    return bool(value) and value != NOT_SPECIFIED
+
+
+def delta_path(excel_path: str | Path) -> Path:
+    """Return the CSV file collecting rows not yet merged into ``excel_path``."""
+
+    return Path(excel_path).with_suffix(".delta.csv")
+
 
 def load_existing_listing_ids(path: str | Path) -> Set[str]:
-    """Return listing IDs already stored in the Excel file (if any)."""
+    """Return listing IDs already stored in the Excel file (if any).
+
+    The sidecar ID index is used when it is up to date; otherwise the
+    workbook is parsed once and the index is created for the next start.
+    """
 
     excel_path = Path(path)
     if not excel_path.exists():
         return set()
 
-    workbook = load_workbook(excel_path)
-    worksheet = workbook.active
+    indexed_ids = id_index.load_ids(excel_path)
+    if indexed_ids is not None:
+        return indexed_ids
+
+    from openpyxl import load_workbook
 
+    workbook = load_workbook(os.fspath(excel_path), read_only=True, data_only=True, keep_links=False)
     listing_ids: Set[str] = set()
-    for row in worksheet.iter_rows(min_row=2, values_only=True):
-        if not row or len(row) < 9:  # pragma: no cover - defensive guard
-            continue
-        listing_id = row[8]
-        if listing_id:
-            listing_ids.add(str(listing_id))
+    try:
+        id_column = LISTING_ID_COLUMN + 1
+        for (listing_id,) in workbook.active.iter_rows(
+            min_row=2, min_col=id_column, max_col=id_column, values_only=True
+        ):
+            if _is_listing_id(listing_id):
+                listing_ids.add(sys.intern(str(listing_id)))
+    finally:
+        workbook.close()
+
+    try:
+        id_index.save_ids(excel_path, listing_ids)
+    except OSError as exc:
+        logger.warning("ID-Index konnte nicht geschrieben werden: %s", exc)
 
     return listing_ids
 
 
-def write_listings_to_excel(listings: Iterable[Listing], path: str | Path) -> Path:
-    """Write the provided listings to an Excel file."""
+def _iter_existing_rows(excel_path: Path) -> Iterator[tuple]:
+    """Stream the data rows of an existing export without loading it fully."""
 
-    output_path = Path(path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if not excel_path.exists():
+        return
 
-    existing_ids = load_existing_listing_ids(output_path)
-
-    if output_path.exists():
-        workbook = load_workbook(output_path)
-        worksheet = workbook.active
-    else:
-        workbook = Workbook()
-        worksheet = workbook.active
-        worksheet.title = "Anzeigen"
-        worksheet.append(HEADERS)
-        worksheet.column_dimensions["A"].width = 40
-        worksheet.column_dimensions["B"].width = 80
-        worksheet.column_dimensions["C"].width = 10
-        worksheet.column_dimensions["D"].width = 20
-        worksheet.column_dimensions["E"].width = 100
-        worksheet.column_dimensions["F"].width = 20
-        worksheet.column_dimensions["G"].width = 20
-        worksheet.column_dimensions["H"].width = 20
-        worksheet.column_dimensions["I"].width = 20
-        worksheet.column_dimensions["J"].width = 30
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(os.fspath(excel_path), read_only=True)
+    try:
+        yield from workbook.active.iter_rows(min_row=2, values_only=True)
+    finally:
+        workbook.close()
 
-    for listing in listings:
-        if listing.listing_id and listing.listing_id in existing_ids:
-            continue
 
-        worksheet.append(
-            [
+def _listing_rows(listings: Iterable[Listing], skip_ids: Set[str]) -> list[tuple]:
+    """Build the row tuples for ``listings``, dropping known and repeated IDs."""
+
+    seen_ids = set(skip_ids)
+    rows: list[tuple] = []
+    append = rows.append
+    for listing in listings:
+        listing_id = listing.listing_id
+        if _is_listing_id(listing_id):
+            listing_id = sys.intern(listing_id)
+            if listing_id in seen_ids:
+                continue
+            seen_ids.add(listing_id)
+        append(
+            (
                 listing.title,
                 listing.url,
                 listing.postal_code,
@@ -85,18 +134,185 @@ def write_listings_to_excel(listings: Iterable[Listing], path: str | Path) -> Pa
                 listing.gender,
                 listing.target_audience,
                 listing.financial_interest,
-                listing.listing_id,
+                listing_id,
                 listing.username,
-            ]
+            )
         )
+    return rows
+
+
+def append_listings_csv(
+    listings: Iterable[Listing],
+    path: str | Path,
+    *,
+    existing_ids: Set[str] | None = None,
+) -> int:
+    """Append the provided listings to a CSV delta file.
+
+    Appending costs one line per listing, whereas every Excel save compresses
+    the whole sheet again. The loop mode therefore collects new listings here
+    and merges them into the workbook with :func:`flush_csv_to_xlsx` only
+    from time to time. Returns the number of appended rows.
+    """
+
+    csv_path = Path(path)
+    new_rows = _listing_rows(listings, existing_ids or set())
+    if not new_rows:
+        return 0
+
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not csv_path.exists() or csv_path.stat().st_size == 0
+    with csv_path.open("a", newline="", encoding="utf-8", buffering=1 << 20) as handle:
+        writer = csv.writer(handle)
+        if write_header:
+            writer.writerow(HEADERS)
+        writer.writerows(new_rows)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    if existing_ids is not None:
+        existing_ids.update(
+            row[LISTING_ID_COLUMN]
+            for row in new_rows
+            if _is_listing_id(row[LISTING_ID_COLUMN])
+        )
+    return len(new_rows)
+
+
+def _iter_csv_rows(csv_path: Path) -> Iterator[tuple]:
+    """Read the data rows of a delta file, restoring empty cells as ``None``."""
+
+    with csv_path.open(newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        next(reader, None)
+        for row in reader:
+            row = row[: len(HEADERS)] + [""] * (len(HEADERS) - len(row))
+            yield tuple(value or None for value in row)
+
+
+def flush_csv_to_xlsx(
+    csv_path: str | Path,
+    xlsx_path: str | Path,
+    *,
+    existing_ids: Set[str] | None = None,
+) -> Path:
+    """Merge the rows collected in ``csv_path`` into the Excel file.
+
+    The delta file is removed once the workbook has been written.
+    """
+
+    delta_file = Path(csv_path)
+    output_path = Path(xlsx_path)
+    if not delta_file.exists():
+        return output_path
+
+    seen_ids: Set[str] = set()
+    new_rows: list[tuple] = []
+    for row in _iter_csv_rows(delta_file):
+        listing_id = row[LISTING_ID_COLUMN]
+        if _is_listing_id(listing_id):
+            if listing_id in seen_ids:
+                continue
+            seen_ids.add(sys.intern(listing_id))
+        new_rows.append(row)
+
+    _write_rows(new_rows, output_path, existing_ids)
+    delta_file.unlink()
+    return output_path
+
+
+def write_listings_to_excel(
+    listings: Iterable[Listing],
+    path: str | Path,
+    *,
+    existing_ids: Set[str] | None = None,
+) -> Path:
+    """Write the provided listings to an Excel file.
+
+    The workbook is produced in openpyxl's write-only mode: existing rows are
+    streamed from the current file and new listings are appended behind them,
+    so memory stays constant per row regardless of the export size.
+
+    ``existing_ids`` lets long-running callers keep the known listing IDs in
+    memory across writes. Listings contained in it are skipped without
+    touching the file, and the set is updated with every newly written ID.
+    """
+
+    new_rows = _listing_rows(listings, existing_ids or set())
+    return _write_rows(new_rows, Path(path), existing_ids)
+
+
+def _write_rows(
+    new_rows: list[tuple], output_path: Path, existing_ids: Set[str] | None
+) -> Path:
+    """Append ``new_rows`` to the workbook at ``output_path``."""
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if not new_rows and output_path.exists():
+        return output_path
+
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, NamedStyle
+
+    workbook = Workbook(write_only=True)
+    workbook.add_named_style(
+        NamedStyle(BODY_STYLE, alignment=Alignment(wrap_text=True))
+    )
+    worksheet = workbook.create_sheet("Anzeigen")
+    dimensions = worksheet.column_dimensions
+    for column, width in COLUMN_WIDTHS:
+        dimensions[column].width = width
+    worksheet.append(HEADERS)
+
+    def append_row(values: list) -> None:
+        body_cell = WriteOnlyCell(worksheet, value=values[BODY_COLUMN])
+        body_cell.style = BODY_STYLE
+        values[BODY_COLUMN] = body_cell
+        worksheet.append(values)
+
+    stored_ids: Set[str] = set()
+    for row in _iter_existing_rows(output_path):
+        values = list(row)
+        if len(values) < len(HEADERS):
+            values.extend([None] * (len(HEADERS) - len(values)))
+        if _is_listing_id(values[LISTING_ID_COLUMN]):
+            stored_ids.add(sys.intern(str(values[LISTING_ID_COLUMN])))
+        append_row(values)
+
+    if existing_ids is not None:
+        existing_ids.update(stored_ids)
+
+    rows_to_append = [
+        row
+        for row in new_rows
+        if not (
+            _is_listing_id(row[LISTING_ID_COLUMN])
+            and row[LISTING_ID_COLUMN] in stored_ids
+        )
+    ]
+    if not rows_to_append and output_path.exists():
+        # Nothing new to persist – keep the current file untouched.
+        worksheet.close()
+        return output_path
+
+    for row in rows_to_append:
+        append_row(list(row))
+    written_ids = {
+        row[LISTING_ID_COLUMN]
+        for row in rows_to_append
+        if _is_listing_id(row[LISTING_ID_COLUMN])
+    }
 
-        if listing.listing_id:
-            existing_ids.add(listing.listing_id)
+    # Write-only workbooks cannot be saved over the file they are streamed
+    # from, therefore the export is written next to it and swapped in.
+    temp_path = output_path.with_name(f"{output_path.name}.tmp")
+    workbook.save(os.fspath(temp_path))
+    temp_path.replace(output_path)
+    id_index.save_ids(output_path, stored_ids | written_ids)
 
-    wrap_alignment = Alignment(wrap_text=True)
-    for cell in worksheet["E:E"]:
-        cell.alignment = wrap_alignment
+    if existing_ids is not None:
+        existing_ids.update(written_ids)
 
-    workbook.save(output_path)
-    print(f"[SUCCESS] Excel-Datei gespeichert unter: {output_path}")
+    logger.info("Excel-Datei gespeichert unter: %s", output_path)
     return output_path
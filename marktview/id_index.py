@@ -0,0 +1,58 @@
+"""Sidecar index of listing IDs stored next to the Excel export.
+
+Reading the IDs back from the workbook requires unzipping and parsing the
+complete sheet. The index keeps the same information as a small JSON list so
+that startup only has to read a few bytes per listing.
+"""
+
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+from .models import NOT_SPECIFIED
+
+logger = logging.getLogger(__name__)
+
+
+def index_path(excel_path: str | Path) -> Path:
+    """Return the location of the ID index belonging to ``excel_path``."""
+
+    return Path(excel_path).with_suffix(".ids.json")
+
+
+def load_ids(excel_path: str | Path) -> Optional[Set[str]]:
+    """Return the indexed IDs or ``None`` if the index is missing or stale."""
+
+    excel_file = Path(excel_path)
+    sidecar = index_path(excel_file)
+    try:
+        if sidecar.stat().st_mtime_ns < excel_file.stat().st_mtime_ns:
+            # Die Excel-Datei wurde nach dem Index verändert.
+            return None
+        data = json.loads(sidecar.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, list):
+        logger.warning("ID-Index hat ein unerwartetes Format: %s", sidecar)
+        return None
+
+    # IDs are interned so that lookups against freshly scraped IDs can
+    # short-circuit on identity.
+    return {
+        sys.intern(str(listing_id)) for listing_id in data if listing_id != NOT_SPECIFIED
+    }
+
+
+def save_ids(excel_path: str | Path, listing_ids: Iterable[str]) -> Path:
+    """Atomically replace the ID index belonging to ``excel_path``."""
+
+    sidecar = index_path(excel_path)
+    temp_path = sidecar.with_name(f"{sidecar.name}.tmp")
+    # Der Platzhalter für fehlende Kennungen ist keine Kennung.
+    real_ids = {listing_id for listing_id in listing_ids if listing_id != NOT_SPECIFIED}
+    temp_path.write_text(json.dumps(sorted(real_ids)), encoding="utf-8")
+    temp_path.replace(sidecar)
+    return sidecar
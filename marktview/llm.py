@@ -9,18 +9,26 @@ are used as-is without starting a local server.
 
 from __future__ import annotations
 
+import asyncio
 import atexit
+import hashlib
+import json
 import logging
+import logging.handlers
 import math
 import os
+import queue
 import re
 import shutil
+import string
 import subprocess
 import threading
 import time
-from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 from urllib.parse import urlsplit
 
 import textwrap
@@ -28,34 +36,105 @@ import textwrap
 import requests
 import yaml
 
-from .models import Listing
+try:  # orjson parses JSON several times faster than the standard library.
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - optional dependency
+    _json_loads = json.loads
+from requests.adapters import HTTPAdapter
+
+from .models import NOT_SPECIFIED, Listing
 
 logger = logging.getLogger(__name__)
 io_logger = logging.getLogger(f"{__name__}.io")
 io_logger.propagate = False
-
-# Default Ollama setup. A compact text generation model is used by default
-# while still supporting the /api/generate endpoint.
-DEFAULT_MODEL = "gemma3:4b"
+# Prompts and answers are only recorded once configure_llm_logging() attached
+# the dedicated log file.
+io_logger.setLevel(logging.WARNING)
+
+# Default Ollama setup. Small 4-bit quantised models are used per task: the
+# gender question asks for a weighed judgement plus a percentage, the target
+# audience is a single word and gets by with an even smaller model.
+# MARKTVIEW_LLM_MODEL replaces the model of every task.
+_MODEL_OVERRIDE = os.environ.get("MARKTVIEW_LLM_MODEL")
+MODEL_ALIASES = {
+    "gender": _MODEL_OVERRIDE or "gemma3:1b-it-q4_K_M",
+    "target_audience": _MODEL_OVERRIDE or "qwen2.5:0.5b-instruct-q4_K_M",
+}
+DEFAULT_MODEL = MODEL_ALIASES["gender"]
 DEFAULT_ENDPOINT = "http://127.0.0.1:11434/api/generate"
 DEFAULT_TIMEOUT = 30.0
+# Number of requests the local Ollama server handles at the same time. Batch
+# queries fan out to the same number of parallel requests.
+DEFAULT_NUM_PARALLEL = 4
+# Keep the model loaded for the whole session instead of Ollama's default of
+# unloading it after five idle minutes.
+KEEP_ALIVE = -1
+# Generation limits: both questions are answered with a few words, so long
+# or creative continuations only cost time and trigger retries.
+DEFAULT_OPTIONS = {"num_predict": 24, "temperature": 0.1, "top_k": 10, "stop": ["\n\n"]}
+TARGET_AUDIENCE_OPTIONS = {"num_predict": 8}
+# Number of answers each client remembers for repeated, identical prompts.
+RESPONSE_CACHE_SIZE = 4096
 PROMPTS_FILE = Path(__file__).with_name("prompts.yaml")
+# Keep-alive connections to the LLM server; the async helpers use as many
+# worker threads, so every in-flight request finds a pooled connection.
+HTTP_POOL_SIZE = 16
+
+
+def _create_http_session() -> requests.Session:
+    """Return a session whose keep-alive connections are shared by all clients."""
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# ``requests.Session`` may be used from several threads as long as its
+# configuration is not changed, which allows the batch fan-out to share it.
+_http_session = _create_http_session()
+# Blocking LLM requests from coroutines run here instead of in the event
+# loop's default executor, which they would otherwise fill up while the
+# scraper waits for detail pages.
+_llm_executor = ThreadPoolExecutor(
+    max_workers=HTTP_POOL_SIZE, thread_name_prefix="marktview-llm"
+)
+
+
+async def _run_in_llm_executor(func, *args, **kwargs):
+    """Run a blocking LLM call on the dedicated executor."""
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_llm_executor, partial(func, *args, **kwargs))
+
+
+_configured_log_paths: set[Path] = set()
+# Prompts and answers are collected in memory and written in blocks instead
+# of one small write per line; errors are written immediately.
+LOG_BUFFER_CAPACITY = 256
 
 
 def configure_llm_logging(log_dir: str | Path) -> None:
     """Configure a dedicated log file for LLM traffic."""
 
     log_path = Path(log_dir) / "llm.log"
+    if log_path in _configured_log_paths:
+        return
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
-    for handler in io_logger.handlers:
-        if isinstance(handler, logging.FileHandler) and Path(handler.baseFilename) == log_path:
-            return
-
     handler = logging.FileHandler(log_path, encoding="utf-8")
     handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-    io_logger.addHandler(handler)
+    # logging.shutdown() flushes the buffer when the interpreter exits.
+    io_logger.addHandler(
+        logging.handlers.MemoryHandler(
+            LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=handler
+        )
+    )
     io_logger.setLevel(logging.INFO)
+    _configured_log_paths.add(log_path)
 
 
 class LLMInferenceError(RuntimeError):
@@ -69,9 +148,26 @@ class _LocalOllamaService:  # pragma: no cover - integration-heavy logic
         self._lock = threading.Lock()
         self._process: subprocess.Popen[str] | None = None
         self._started_by_app = False
+        self._stop_registered = False
+        self._session = _http_session
+        self._binary: str | None = None
+        # (model, endpoint) pairs verified to be served. The frozenset copy is
+        # republished on every change so the fast path can read it without
+        # taking the lock.
+        self._ready: set[tuple[str, str]] = set()
+        self._ready_snapshot: frozenset[tuple[str, str]] = frozenset()
+        self._preparations: dict[tuple[str, str], threading.Thread] = {}
+        self._preparation_errors: dict[tuple[str, str], Exception] = {}
+        # Keys whose model has been loaded into memory by _warm_up.
+        self._warmed: set[tuple[str, str]] = set()
 
     def _suggested_thread_count(self) -> int:
-        cpu_count = os.cpu_count() or 1
+        # Respect CPU affinity/cgroup limits (e.g. in containers) where the
+        # platform exposes them; os.cpu_count() reports all host CPUs.
+        try:
+            cpu_count = len(os.sched_getaffinity(0))
+        except AttributeError:
+            cpu_count = os.cpu_count() or 1
         return max(1, math.ceil(cpu_count * 0.5))
 
     def _base_url(self, endpoint: str) -> str:
@@ -79,37 +175,87 @@ class _LocalOllamaService:  # pragma: no cover - integration-heavy logic
         return f"{parsed.scheme}://{parsed.netloc}"
 
     def _is_reachable(self, base_url: str) -> bool:
+        # HEAD avoids transferring the model list just to check availability.
         try:
-            response = requests.get(f"{base_url}/api/tags", timeout=3)
-            return response.ok
+            response = self._session.head(f"{base_url}/api/tags", timeout=1)
+            return response.status_code == 405 or response.ok
         except Exception:  # noqa: BLE001
             return False
 
-    def _model_exists(self, base_url: str, model: str) -> bool:
-        """Check whether the requested model is already available on the server."""
+    def _probe(self, base_url: str, model: str) -> tuple[bool, bool]:
+        """Return ``(reachable, has_model)`` with a single request."""
 
+        # /api/show beschreibt nur das angefragte Modell und antwortet mit
+        # 404, wenn es fehlt – jede Antwort beweist zugleich, dass der
+        # Server läuft, ein separater Erreichbarkeitstest entfällt.
         try:
-            response = requests.get(f"{base_url}/api/tags", timeout=3)
-            response.raise_for_status()
-            data = response.json()
-            models = data.get("models", [])
-            return any(item.get("name") == model for item in models)
+            response = self._session.post(
+                f"{base_url}/api/show", json={"model": model}, timeout=3
+            )
         except Exception:  # noqa: BLE001
-            return False
+            return False, False
+        return True, response.status_code == 200
 
     def _wait_until_ready(self, base_url: str, timeout: float = 20.0) -> None:
-        deadline = time.time() + timeout
-        while time.time() < deadline:
+        # Erst in kurzen, dann in immer längeren Abständen nachfragen: ein
+        # bereits laufender Server wird sofort erkannt, ein Kaltstart nicht
+        # mit Anfragen überhäuft.
+        deadline = time.monotonic() + timeout
+        delay = 0.025
+        while time.monotonic() < deadline:
             if self._is_reachable(base_url):
                 return
-            time.sleep(0.5)
+            time.sleep(delay)
+            delay = min(delay * 1.5, 0.25)
         raise LLMInferenceError(
             "Lokaler Ollama-Server konnte nicht gestartet werden (keine Antwort)."
         )
 
-    def _pull_model(self, binary: str, model: str) -> None:
+    def _find_binary(self) -> str:
+        if self._binary is None:
+            self._binary = shutil.which("ollama")
+        if not self._binary:
+            raise LLMInferenceError(
+                "Das Programm konnte 'ollama' nicht finden. Bitte installiere "
+                "Ollama gemäß https://ollama.com/download."
+            )
+        return self._binary
+
+    def _pull_model(self, base_url: str, model: str) -> None:
+        """Download ``model`` through the running server's pull API."""
+
+        logger.info("Lade Ollama-Modell '%s' herunter …", model)
+        response = self._session.post(
+            f"{base_url}/api/pull",
+            json={"model": model, "stream": True},
+            # Der Fortschritt kommt laufend; nur der Verbindungsaufbau und
+            # einzelne Fortschrittsmeldungen sind zeitlich begrenzt.
+            timeout=(3, 600),
+            stream=True,
+        )
+        try:
+            if response.status_code == 404:
+                # Sehr alte Server kennen /api/pull nicht.
+                self._pull_model_with_cli(model)
+                return
+            if response.status_code >= 400:
+                raise LLMInferenceError(
+                    f"Ollama-Modell '{model}' konnte nicht gezogen werden (HTTP {response.status_code})."
+                )
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                status = _json_loads(line)
+                if "error" in status:
+                    raise LLMInferenceError(
+                        f"Ollama-Modell '{model}' konnte nicht gezogen werden: {status['error']}"
+                    )
+        finally:
+            response.close()
+
+    def _pull_model_with_cli(self, model: str) -> None:
         result = subprocess.run(
-            [binary, "pull", model],
+            [self._find_binary(), "pull", model],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.STDOUT,
             check=False,
@@ -119,42 +265,152 @@ class _LocalOllamaService:  # pragma: no cover - integration-heavy logic
                 f"Ollama-Modell '{model}' konnte nicht gezogen werden."
             )
 
-    def ensure_running(self, *, model: str, endpoint: str) -> None:
-        """Ensure Ollama is running and the model is available."""
+    def ensure_running(self, *, model: str, endpoint: str, wait: bool = True) -> None:
+        """Ensure Ollama is running and the model is available.
+
+        Waiting for the server and pulling the model happen on a background
+        thread. With ``wait=False`` the call returns right after starting that
+        preparation, so the download overlaps with other work; the next call
+        with ``wait=True`` joins it.
+        """
+
+        key = (model, endpoint)
+        if key in self._ready_snapshot:
+            return
 
         base_url = self._base_url(endpoint)
 
         with self._lock:
-            reachable = self._is_reachable(base_url)
+            if key in self._ready:
+                return
 
-            binary = shutil.which("ollama")
-            if not binary:
-                raise LLMInferenceError(
-                    "Das Programm konnte 'ollama' nicht finden. Bitte installiere "
-                    "Ollama gemäß https://ollama.com/download."
-                )
+            preparation = self._preparations.get(key)
+            if preparation is None:
+                preparation = self._start_preparation(key, base_url)
+                if preparation is None:
+                    return
+
+        if wait:
+            self._join_preparation(key, preparation)
+
+    def _start_preparation(
+        self, key: tuple[str, str], base_url: str
+    ) -> threading.Thread | None:
+        """Start the server if needed and return the model preparation thread.
+
+        Returns ``None`` when the model is already served. The caller must
+        hold the lock.
+        """
+
+        model = key[0]
+        reachable, has_model = self._probe(base_url, model)
+        if has_model:
+            self._mark_ready(key)
+            if key not in self._warmed:
+                # Das Modell liegt bereits vor, ist aber evtl. nicht geladen:
+                # im Hintergrund laden, ohne den Aufrufer warten zu lassen.
+                self._warmed.add(key)
+                threading.Thread(
+                    target=self._warm_up,
+                    args=(base_url, model),
+                    name=f"ollama-warm-{model}",
+                    daemon=True,
+                ).start()
+            return None
 
-            if not reachable:
-                thread_count = self._suggested_thread_count()
-                env = os.environ.copy()
-                env["OLLAMA_NUM_THREADS"] = str(thread_count)
+        if not reachable:
+            binary = self._find_binary()
+            thread_count = self._suggested_thread_count()
+            env = os.environ.copy()
+            env["OLLAMA_NUM_THREADS"] = str(thread_count)
+            env["OMP_NUM_THREADS"] = str(thread_count)
+            env["OPENBLAS_NUM_THREADS"] = str(thread_count)
+            # Ohne diese Einstellungen arbeitet Ollama Anfragen je nach
+            # Version nacheinander ab bzw. lädt das Modell mehrfach.
+            env.setdefault("OLLAMA_NUM_PARALLEL", str(DEFAULT_NUM_PARALLEL))
+            env.setdefault(
+                "OLLAMA_MAX_LOADED_MODELS", str(len(set(MODEL_ALIASES.values())))
+            )
 
-                logger.info(
-                    "Starte lokalen Ollama-Server mit %s Threads …", thread_count
-                )
-                self._process = subprocess.Popen(
-                    [binary, "serve"],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    env=env,
-                )
-                self._started_by_app = True
-            elif self._model_exists(base_url, model):
-                return
+            logger.info(
+                "Starte lokalen Ollama-Server mit %s Threads …", thread_count
+            )
+            self._process = subprocess.Popen(
+                [binary, "serve"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.STDOUT,
+                text=True,
+                env=env,
+            )
+            if not self._stop_registered:
+                # Erst registrieren, wenn tatsächlich ein Server gestartet
+                # wurde; Läufe ohne LLM-Aufruf brauchen keinen Exit-Hook.
+                atexit.register(self.stop)
+                self._stop_registered = True
+            self._started_by_app = True
+
+        preparation = threading.Thread(
+            target=self._prepare_model,
+            args=(key, base_url),
+            name=f"ollama-pull-{model}",
+            daemon=True,
+        )
+        self._preparations[key] = preparation
+        preparation.start()
+        return preparation
+
+    def _prepare_model(self, key: tuple[str, str], base_url: str) -> None:
+        model = key[0]
+        try:
+            self._wait_until_ready(base_url)
+            self._pull_model(base_url, model)
+            self._warm_up(base_url, model)
+            self._warmed.add(key)
+        except Exception as exc:  # noqa: BLE001
+            with self._lock:
+                self._preparation_errors[key] = exc
+            return
+
+        with self._lock:
+            self._mark_ready(key)
+
+    def _join_preparation(self, key: tuple[str, str], preparation: threading.Thread) -> None:
+        preparation.join()
+        with self._lock:
+            if self._preparations.get(key) is preparation:
+                del self._preparations[key]
+            error = self._preparation_errors.pop(key, None)
+        if error is not None:
+            if isinstance(error, LLMInferenceError):
+                raise error
+            raise LLMInferenceError(
+                f"Ollama-Modell '{key[0]}' konnte nicht vorbereitet werden: {error}"
+            ) from error
+
+    def _warm_up(self, base_url: str, model: str) -> None:
+        """Load ``model`` into memory so the first real query skips the load."""
+
+        try:
+            self._session.post(
+                f"{base_url}/api/generate",
+                json={"model": model, "prompt": "", "keep_alive": KEEP_ALIVE, "stream": False},
+                timeout=120,
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Ollama-Modell konnte nicht vorab geladen werden: %s", exc)
 
-        self._wait_until_ready(base_url)
-        self._pull_model(binary, model)
+    def _mark_ready(self, key: tuple[str, str]) -> None:
+        """Remember ``key`` as served; the caller must hold the lock."""
+
+        self._ready.add(key)
+        self._ready_snapshot = frozenset(self._ready)
+
+    def invalidate(self, *, model: str, endpoint: str) -> None:
+        """Forget that ``model`` is served so the next call probes again."""
+
+        with self._lock:
+            self._ready.discard((model, endpoint))
+            self._ready_snapshot = frozenset(self._ready)
 
     def stop(self) -> None:
         with self._lock:
@@ -166,10 +422,18 @@ class _LocalOllamaService:  # pragma: no cover - integration-heavy logic
                     self._process.kill()
             self._process = None
             self._started_by_app = False
+            self._ready.clear()
+            self._ready_snapshot = frozenset()
+            self._warmed.clear()
 
 
 _ollama_service = _LocalOllamaService()
-atexit.register(_ollama_service.stop)
+
+
+def model_for_task(task: str) -> str:
+    """Return the default model for ``task`` (see ``MODEL_ALIASES``)."""
+
+    return MODEL_ALIASES.get(task, DEFAULT_MODEL)
 
 
 def _build_gender_prompt(listing: Listing) -> str:
@@ -219,57 +483,106 @@ def _load_prompt_templates() -> dict[str, str]:
     return templates
 
 
-def _render_prompt(template_key: str, listing: Listing) -> str:
-    """Render a prompt template with listing details inserted."""
+@lru_cache(maxsize=None)
+def _compile_prompt(template_key: str) -> tuple[str, ...] | None:
+    """Split a template into its literal parts around ``{listing_details}``.
+
+    Rendering then only has to join the parts with the listing details
+    instead of re-parsing the format string for every listing.
+    """
 
     template = _load_prompt_templates().get(template_key, "")
     if not template:
-        return ""
+        return None
 
+    parts: list[str] = []
+    literal = ""
     try:
-        return template.format(listing_details=_format_listing_details(listing)).strip()
-    except Exception:  # noqa: BLE001
+        for text, field, spec, conversion in string.Formatter().parse(template.strip()):
+            literal += text
+            if field is None:
+                continue
+            if field != "listing_details" or spec or conversion:
+                raise ValueError(f"unbekannter Platzhalter {{{field}}}")
+            parts.append(literal)
+            literal = ""
+    except ValueError:
         logger.exception("Prompt '%s' konnte nicht gerendert werden.", template_key)
-        return ""
+        return None
+    parts.append(literal)
+    return tuple(parts)
 
 
-def _format_listing_details(listing: Listing) -> str:
-    """Render listing data in a structured, multi-line format for prompts."""
+def _render_prompt(template_key: str, listing: Listing) -> str:
+    """Render a prompt template with listing details inserted."""
+
+    parts = _compile_prompt(template_key)
+    if parts is None:
+        return ""
+    if len(parts) == 1:
+        return parts[0]
+    return _format_listing_details(listing).join(parts)
 
-    fields = [
-        ("Titel", listing.title or "nicht angegeben"),
-        ("Beschreibung", listing.body or "nicht angegeben"),
-        ("Nutzername", listing.username or "nicht angegeben"),
-        ("Postleitzahl", listing.postal_code or "nicht angegeben"),
-        ("Erstellt am", listing.created_at or "nicht angegeben"),
-        ("Listing-ID", listing.listing_id or "nicht angegeben"),
-        ("URL", listing.url or "nicht angegeben"),
-    ]
 
-    lines = []
-    for label, value in fields:
-        clean_value = " ".join(str(value).split()) if isinstance(value, str) else value
-        if label == "Beschreibung" and isinstance(value, str):
-            clean_value = textwrap.indent(value.strip() or "nicht angegeben", "  ")
-            lines.append(f"- {label}:\n{clean_value}")
-        else:
-            lines.append(f"- {label}: {clean_value}")
+def _single_line(value: Optional[str]) -> str:
+    """Collapse ``value`` to one line, substituting missing values."""
 
-    return "\n".join(lines)
+    return " ".join(value.split()) if value else NOT_SPECIFIED
 
 
-def _normalize_gender_output(raw_output: str) -> str:
-    """Normalize LLM output to the expected 'geschlecht <zahl>%'-format."""
+def _format_listing_details(listing: Listing) -> str:
+    """Render listing data in a structured, multi-line format for prompts."""
+
+    description = textwrap.indent((listing.body or "").strip() or NOT_SPECIFIED, "  ")
+    return (
+        f"- Titel: {_single_line(listing.title)}\n"
+        f"- Beschreibung:\n{description}\n"
+        f"- Nutzername: {_single_line(listing.username)}\n"
+        f"- Postleitzahl: {_single_line(listing.postal_code)}\n"
+        f"- Erstellt am: {_single_line(listing.created_at)}\n"
+        f"- Listing-ID: {_single_line(listing.listing_id)}\n"
+        f"- URL: {_single_line(listing.url)}"
+    )
 
-    cleaned = raw_output.replace("<", " ").replace(">", " ").strip()
-    cleaned = " ".join(cleaned.split())
 
-    gender_pattern = re.compile(r"\b(weiblich|männlich|divers|unbekannt)\b", re.IGNORECASE)
-    gender_match = gender_pattern.search(cleaned)
+_ANGLE_BRACKETS = str.maketrans({"<": " ", ">": " "})
+_WHITESPACE_RE = re.compile(r"\s+")
+_GENDER_RE = re.compile(r"\b(weiblich|männlich|divers|unbekannt)\b", re.IGNORECASE)
+_PERCENT_RE = re.compile(r"(\d{1,3})\s*%?")
+
+# One alternation per target-audience label. The group order is the label
+# priority: if several labels occur in an answer, the first group wins.
+_AUDIENCE_LABELS = {
+    "weiblich": "weiblich",
+    "maennlich": "männlich",
+    "divers": "divers",
+    "bi": "bi",
+    "unbekannt": "unbekannt",
+}
+_AUDIENCE_RE = re.compile(
+    r"\b(?P<weiblich>weiblich|frau|frauen|damen)\b"
+    r"|\b(?P<maennlich>männlich|mann|männer|herren)\b"
+    r"|\b(?P<divers>divers|nonbinär|non-binary|trans|trans\*|transgender)\b"
+    r"|\b(?P<bi>bi|bisexuell|beide|alle)\b"
+    r"|\b(?P<unbekannt>unbekannt|unklar|k\.A\.)\b",
+    re.IGNORECASE,
+)
+_AUDIENCE_PRIORITY = {name: rank for rank, name in enumerate(_AUDIENCE_LABELS)}
+
+
+def _normalize_gender_output(raw_output: str) -> tuple[str, int]:
+    """Normalize LLM output to the expected 'geschlecht <zahl>%'-format.
+
+    Returns the normalized answer together with its confidence in percent.
+    """
+
+    cleaned = _WHITESPACE_RE.sub(" ", raw_output.translate(_ANGLE_BRACKETS)).strip()
+
+    gender_match = _GENDER_RE.search(cleaned)
     if not gender_match:
         raise LLMInferenceError("Antwort enthält kein erkennbares Geschlecht.")
 
-    percent_match = re.search(r"(\d{1,3})\s*%?", cleaned)
+    percent_match = _PERCENT_RE.search(cleaned)
     if not percent_match:
         # Einige Modelle ignorieren gelegentlich die Anweisung, eine Zahl
         # zurückzugeben. In diesem Fall wird die Antwort nicht mehr hart
@@ -283,29 +596,81 @@ def _normalize_gender_output(raw_output: str) -> str:
         raise LLMInferenceError("Antwort enthält einen Prozentwert unter 50%.")
 
     gender = gender_match.group(1).lower()
-    return f"{gender} {percent}%"
+    return f"{gender} {percent}%", percent
+
+
+def _normalize_target_audience_output(raw_output: str) -> tuple[str, int]:
+    """Normalize LLM output for the target audience question.
+
+    The answer carries no percentage, so its confidence is always 100.
+    """
 
+    cleaned = _WHITESPACE_RE.sub(" ", raw_output.translate(_ANGLE_BRACKETS)).strip()
 
-def _normalize_target_audience_output(raw_output: str) -> str:
-    """Normalize LLM output for the target audience question."""
+    groups = {match.lastgroup for match in _AUDIENCE_RE.finditer(cleaned)}
+    if not groups:
+        raise LLMInferenceError("Antwort enthält keine erkennbaren Zielgruppe.")
 
-    cleaned = raw_output.replace("<", " ").replace(">", " ").strip()
-    cleaned = " ".join(cleaned.split())
+    return _AUDIENCE_LABELS[min(groups, key=_AUDIENCE_PRIORITY.__getitem__)], 100
 
-    synonyms = {
-        "weiblich": {"weiblich", "frau", "frauen", "damen"},
-        "männlich": {"männlich", "mann", "männer", "herren"},
-        "divers": {"divers", "nonbinär", "non-binary", "trans", "trans*", "transgender"},
-        "bi": {"bi", "bisexuell", "beide", "alle"},
-        "unbekannt": {"unbekannt", "unklar", "k.A."},
-    }
 
-    for normalized, keywords in synonyms.items():
-        pattern = re.compile(r"\b(" + "|".join(re.escape(k) for k in keywords) + r")\b", re.IGNORECASE)
-        if pattern.search(cleaned):
-            return normalized
+# Some answers normalise before they are finished: "weiblich" is accepted
+# with a default confidence, but the model is about to send the percentage.
+# Such streams are only cut once the pattern shows up; otherwise they run
+# until Ollama reports ``done``.
+_STREAM_COMPLETE_RE = {_normalize_gender_output: re.compile(r"\d\s*%")}
+# Target-audience answers may name several labels, the highest priority wins:
+# only the top label is final, any other stream runs until ``done``
+# ("Männer und Frauen" must not be cut after "Männer").
+_STREAM_FINAL_ANSWERS = {
+    _normalize_target_audience_output: frozenset({_AUDIENCE_LABELS["weiblich"]})
+}
+_STREAM_WORD_TAIL_RE = re.compile(r"\w+\Z")
 
-    raise LLMInferenceError("Antwort enthält keine erkennbaren Zielgruppe.")
+
+def _read_streamed_output(response: requests.Response, normalizer) -> str:
+    """Collect a streamed /api/generate answer, stopping once it is usable.
+
+    Closing the response makes Ollama abort the remaining generation.
+    """
+
+    parts: list[str] = []
+    try:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = _json_loads(line)
+            if "error" in chunk:
+                raise LLMInferenceError(f"LLM-Fehler: {chunk['error']}")
+            parts.append(chunk.get("response", ""))
+            if chunk.get("done") or normalizer is None:
+                continue
+            # The last word may still be growing ("Bi" → "Bitte"); only text
+            # up to the last non-word character is judged before ``done``.
+            text = _STREAM_WORD_TAIL_RE.sub("", "".join(parts))
+            complete_re = _STREAM_COMPLETE_RE.get(normalizer)
+            if complete_re is not None and not complete_re.search(text):
+                continue
+            try:
+                answer, _ = normalizer(text)
+            except LLMInferenceError:
+                continue
+            final_answers = _STREAM_FINAL_ANSWERS.get(normalizer)
+            if final_answers is not None and answer not in final_answers:
+                continue
+            break
+    finally:
+        response.close()
+    return "".join(parts)
+
+
+_RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _backoff(attempt: int) -> None:
+    """Sleep before retry ``attempt + 1``: 0.1 s, doubling up to 2 s."""
+
+    time.sleep(min(0.1 * 2 ** (attempt - 1), 2.0))
 
 
 class LLMClient:  # pragma: no cover - network-heavy client logic
@@ -318,11 +683,86 @@ class LLMClient:  # pragma: no cover - network-heavy client logic
         endpoint: str = DEFAULT_ENDPOINT,
         timeout: float = DEFAULT_TIMEOUT,
         service: _LocalOllamaService | None = None,
+        options: dict | None = None,
+        session: requests.Session | None = None,
     ) -> None:
         self.model = model
         self.endpoint = endpoint
         self.timeout = timeout
+        self.options = dict(DEFAULT_OPTIONS if options is None else options)
         self._service = service or _ollama_service
+        self._session = session or _http_session
+        self._cache: OrderedDict[tuple, str] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._used = False
+        self._unload_registered = False
+
+    def prepare(self) -> None:
+        """Start the local server and model download without waiting for it."""
+
+        if self.endpoint != DEFAULT_ENDPOINT:
+            return
+
+        try:
+            self._service.ensure_running(
+                model=self.model, endpoint=self.endpoint, wait=False
+            )
+        except LLMInferenceError as exc:
+            logger.warning("Lokales LLM konnte nicht vorbereitet werden: %s", exc)
+
+    def unload(self) -> None:
+        """Ask the server to release the model if this client has used it."""
+
+        if not self._used:
+            return
+
+        try:
+            self._session.post(
+                self.endpoint,
+                json={"model": self.model, "keep_alive": 0},
+                timeout=2,
+            )
+        except requests.exceptions.RequestException:
+            pass
+        self._used = False
+
+    def clear_cache(self) -> None:
+        """Forget all remembered answers."""
+
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _cached_answer(self, key: tuple) -> Optional[str]:
+        with self._cache_lock:
+            answer = self._cache.get(key)
+            if answer is not None:
+                self._cache.move_to_end(key)
+            return answer
+
+    def _remember_answer(self, key: tuple, answer: str) -> None:
+        with self._cache_lock:
+            self._cache[key] = answer
+            self._cache.move_to_end(key)
+            if len(self._cache) > RESPONSE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _post(self, prompt: str, stream: bool, options: dict) -> requests.Response:
+        """Send one generate request and raise for HTTP error statuses."""
+
+        response = self._session.post(
+            self.endpoint,
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": stream,
+                "keep_alive": KEEP_ALIVE,
+                "options": options,
+            },
+            timeout=self.timeout,
+            stream=stream,
+        )
+        response.raise_for_status()
+        return response
 
     def query(
         self,
@@ -331,8 +771,25 @@ class LLMClient:  # pragma: no cover - network-heavy client logic
         normalizer=_normalize_gender_output,
         enforce_confidence: bool = True,
         fallback: str = "unbekannt 50%",
+        stream: bool = False,
+        options: dict | None = None,
     ) -> str:
-        """Send a prompt to the configured LLM endpoint and return its response."""
+        """Send a prompt to the configured LLM endpoint and return its response.
+
+        Identical prompts are answered from an in-memory LRU cache; fallbacks
+        and low-confidence answers are never cached. With ``stream`` the answer
+        is read token by token and the request is cancelled as soon as
+        ``normalizer`` accepts the text received so far. ``options`` are
+        merged into the client's generation options for this request.
+        """
+
+        # Der Cache hält nur einen 16-Byte-Hash statt des kompletten Prompts.
+        prompt_hash = hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+        cache_key = (self.model, self.endpoint, normalizer, enforce_confidence, prompt_hash)
+        cached = self._cached_answer(cache_key)
+        if cached is not None:
+            logger.debug("LLM-Antwort aus dem Cache: %s", cached)
+            return cached
 
         if self.endpoint == DEFAULT_ENDPOINT:
             self._service.ensure_running(model=self.model, endpoint=self.endpoint)
@@ -343,26 +800,29 @@ class LLMClient:  # pragma: no cover - network-heavy client logic
             self.endpoint,
             self.timeout,
         )
-        io_logger.info(
-            "→ Prompt (Modell='%s', Endpoint='%s'):\n%s",
-            self.model,
-            self.endpoint,
-            prompt,
-        )
-
-        def _send_request() -> requests.Response:
-            response = requests.post(
+        log_io = io_logger.isEnabledFor(logging.INFO)
+        if log_io:
+            io_logger.info(
+                "→ Prompt (Modell='%s', Endpoint='%s'):\n%s",
+                self.model,
                 self.endpoint,
-                json={"model": self.model, "prompt": prompt, "stream": False},
-                timeout=self.timeout,
+                prompt,
             )
-            response.raise_for_status()
-            return response
 
-        max_attempts = 10
+        if not self._unload_registered:
+            # Registered after a started server's stop hook, so the model is
+            # unloaded before the server is terminated (atexit runs LIFO).
+            atexit.register(self.unload)
+            self._unload_registered = True
+        self._used = True
+
+        generation_options = {**self.options, **options} if options else self.options
+
+        max_attempts = 4
+        restarted = False
         for attempt in range(1, max_attempts + 1):
             try:
-                response = _send_request()
+                response = self._post(prompt, stream, generation_options)
             except requests.exceptions.HTTPError as exc:
                 status = exc.response.status_code if exc.response is not None else ""
                 body = exc.response.text if exc.response is not None else "<no response>"
@@ -373,61 +833,117 @@ class LLMClient:  # pragma: no cover - network-heavy client logic
                     self.model,
                     body,
                 )
-                if status == 404 and self.endpoint == DEFAULT_ENDPOINT:
+                if (
+                    status == 404
+                    and self.endpoint == DEFAULT_ENDPOINT
+                    and not restarted
+                    and attempt < max_attempts
+                ):
                     logger.info(
                         "LLM-Endpunkt antwortet mit 404. Starte lokalen Ollama-Server neu und versuche es erneut …"
                     )
+                    restarted = True
                     self._service.stop()
                     self._service.ensure_running(model=self.model, endpoint=self.endpoint)
-                    response = _send_request()
-                else:
-                    if status == 404:
-                        hint = (
-                            "Der LLM-Endpunkt antwortet mit 404 Not Found. Läuft Ollama "
-                            f"auf {self.endpoint}? Starte den Dienst mit 'ollama serve' oder passe den Endpunkt an."
-                        )
-                    else:
-                        hint = f"LLM-Anfrage fehlgeschlagen (HTTP {status})."
-                    if attempt == max_attempts:
-                        raise LLMInferenceError(hint) from exc
-                    logger.info(
-                        "HTTP-Fehler – wiederhole Anfrage (%s/%s)", attempt + 1, max_attempts
-                    )
+                    # Der nächste Versuch läuft durch die normale Fehlerbehandlung.
                     continue
-            except requests.exceptions.RequestException as exc:  # noqa: PERF203
-                logger.exception(
-                    "LLM-Endpunkt konnte nicht erreicht werden: Endpoint='%s', Modell='%s'",
-                    self.endpoint,
-                    self.model,
+                if status == 404:
+                    hint = (
+                        "Der LLM-Endpunkt antwortet mit 404 Not Found. Läuft Ollama "
+                        f"auf {self.endpoint}? Starte den Dienst mit 'ollama serve' oder passe den Endpunkt an."
+                    )
+                else:
+                    hint = f"LLM-Anfrage fehlgeschlagen (HTTP {status})."
+                # Nur vorübergehende Fehler (Überlast, Timeouts) wiederholen.
+                if status not in _RETRYABLE_STATUS or attempt == max_attempts:
+                    raise LLMInferenceError(hint) from exc
+                logger.info(
+                    "HTTP-Fehler – wiederhole Anfrage (%s/%s)", attempt + 1, max_attempts
                 )
-                hint = "LLM-Endpunkt konnte nicht erreicht werden."
-                if self.endpoint == DEFAULT_ENDPOINT:
-                    hint += (
-                        " Ist Ollama installiert und läuft 'ollama serve'? Falls nicht, installiere bzw. starte den Dienst "
-                        "oder konfiguriere einen eigenen Endpunkt."
+                _backoff(attempt)
+                continue
+            except requests.exceptions.RequestException as exc:  # noqa: PERF203
+                # Abgelehnte Verbindungen oder unbekannte Hosts bessern sich
+                # durch Wiederholen nicht – nur Timeouts werden wiederholt.
+                if (
+                    not isinstance(exc, requests.exceptions.Timeout)
+                    or attempt == max_attempts
+                ):
+                    # Den Traceback nur beim endgültigen Fehlschlag ausgeben.
+                    logger.exception(
+                        "LLM-Endpunkt konnte nicht erreicht werden: Endpoint='%s', Modell='%s'",
+                        self.endpoint,
+                        self.model,
                     )
-                if attempt == max_attempts:
+                    hint = "LLM-Endpunkt konnte nicht erreicht werden."
+                    if self.endpoint == DEFAULT_ENDPOINT:
+                        # Der Server ist offenbar weg: beim nächsten Aufruf
+                        # erneut prüfen und ihn ggf. wieder starten.
+                        self._service.invalidate(model=self.model, endpoint=self.endpoint)
+                        hint += (
+                            " Ist Ollama installiert und läuft 'ollama serve'? Falls nicht, installiere bzw. starte den Dienst "
+                            "oder konfiguriere einen eigenen Endpunkt."
+                        )
                     raise LLMInferenceError(f"{hint} Details: {exc}") from exc
-                logger.info(
-                    "Netzwerkfehler – wiederhole Anfrage (%s/%s)", attempt + 1, max_attempts
+                logger.warning(
+                    "LLM-Endpunkt nicht erreichbar (Versuch %s/%s): %s – wiederhole Anfrage",
+                    attempt,
+                    max_attempts,
+                    exc,
                 )
+                _backoff(attempt)
                 continue
 
-            data = response.json()
-            output = data.get("response") or data.get("output")
-            if not output:
-                logger.error(
-                    "LLM-Antwort ohne Text: Keys=%s, Endpoint='%s', Modell='%s'",
-                    list(data.keys()),
-                    self.endpoint,
-                    self.model,
+            try:
+                if stream:
+                    output = _read_streamed_output(response, normalizer)
+                else:
+                    data = _json_loads(response.content)
+                    output = data.get("response") or data.get("output")
+            except (requests.exceptions.RequestException, ValueError) as exc:
+                # Abbrüche oder Timeouts beim Lesen des Antwortkörpers und
+                # unvollständiges JSON sind vorübergehend: erneut anfragen.
+                if attempt == max_attempts:
+                    logger.error(
+                        "LLM-Antwort konnte nicht gelesen werden: Endpoint='%s', Modell='%s': %s",
+                        self.endpoint,
+                        self.model,
+                        exc,
+                    )
+                    raise LLMInferenceError(
+                        f"LLM-Antwort konnte nicht gelesen werden. Details: {exc}"
+                    ) from exc
+                logger.warning(
+                    "LLM-Antwort unvollständig (Versuch %s/%s): %s – wiederhole Anfrage",
+                    attempt,
+                    max_attempts,
+                    exc,
                 )
+                _backoff(attempt)
+                continue
+
+            if not output:
+                if stream:
+                    logger.error(
+                        "LLM-Antwort ohne Text: Endpoint='%s', Modell='%s'",
+                        self.endpoint,
+                        self.model,
+                    )
+                else:
+                    logger.error(
+                        "LLM-Antwort ohne Text: Keys=%s, Endpoint='%s', Modell='%s'",
+                        list(data.keys()),
+                        self.endpoint,
+                        self.model,
+                    )
                 raise LLMInferenceError("Antwort enthält keinen Text.")
 
             cleaned_output = str(output).strip()
 
             try:
-                normalized_output = normalizer(cleaned_output) if normalizer else cleaned_output
+                normalized_output, confidence = (
+                    normalizer(cleaned_output) if normalizer else (cleaned_output, 100)
+                )
             except LLMInferenceError:
                 if attempt < max_attempts:
                     logger.info(
@@ -442,31 +958,142 @@ class LLMClient:  # pragma: no cover - network-heavy client logic
                 )
                 return fallback
 
-            if enforce_confidence:
-                confidence_match = re.search(r"(\d{1,3})%", normalized_output)
-                confidence = int(confidence_match.group(1)) if confidence_match else 0
-                if confidence < 50:
-                    if attempt < max_attempts:
-                        logger.info(
-                            "LLM-Antwort mit geringer Wahrscheinlichkeit (%s%%) – wiederhole Anfrage (%s/%s)",
-                            confidence,
-                            attempt + 1,
-                            max_attempts,
-                        )
-                        continue
-                    logger.warning(
-                        "LLM-Antwort mit geringer Wahrscheinlichkeit (%s%%) – verwende Ergebnis des letzten Versuchs",
+            cacheable = True
+            if enforce_confidence and confidence < 50:
+                if attempt < max_attempts:
+                    logger.info(
+                        "LLM-Antwort mit geringer Wahrscheinlichkeit (%s%%) – wiederhole Anfrage (%s/%s)",
                         confidence,
+                        attempt + 1,
+                        max_attempts,
                     )
+                    continue
+                logger.warning(
+                    "LLM-Antwort mit geringer Wahrscheinlichkeit (%s%%) – verwende Ergebnis des letzten Versuchs",
+                    confidence,
+                )
+                cacheable = False
 
-            io_logger.info(
-                "← Antwort (Modell='%s', Endpoint='%s'): %s",
-                self.model,
-                self.endpoint,
-                cleaned_output,
-            )
+            if log_io:
+                io_logger.info(
+                    "← Antwort (Modell='%s', Endpoint='%s'): %s",
+                    self.model,
+                    self.endpoint,
+                    cleaned_output,
+                )
+            if cacheable:
+                self._remember_answer(cache_key, normalized_output)
             return normalized_output
 
+    def query_batch(
+        self,
+        prompts: Sequence[str],
+        *,
+        normalizer=_normalize_gender_output,
+        enforce_confidence: bool = True,
+        fallback: str = "unbekannt 50%",
+        stream: bool = False,
+        options: dict | None = None,
+        max_parallel: int = DEFAULT_NUM_PARALLEL,
+    ) -> list[str | Exception]:
+        """Send several prompts concurrently and return the answers in order.
+
+        Each answer is validated by ``normalizer`` on its own. A failing prompt
+        yields its exception in place of the answer so that the remaining
+        results are not lost.
+        """
+
+        if not prompts:
+            return []
+
+        if self.endpoint == DEFAULT_ENDPOINT:
+            self._service.ensure_running(model=self.model, endpoint=self.endpoint)
+
+        def _query(prompt: str) -> str | Exception:
+            try:
+                return self.query(
+                    prompt,
+                    normalizer=normalizer,
+                    enforce_confidence=enforce_confidence,
+                    fallback=fallback,
+                    stream=stream,
+                    options=options,
+                )
+            except Exception as exc:  # noqa: BLE001
+                return exc
+
+        # Die Anfragen laufen auf dem gemeinsamen LLM-Executor; höchstens
+        # ``max_parallel`` Aufgaben arbeiten die Warteschlange ab, damit ein
+        # großer Stapel nicht alle Threads des Executors belegt.
+        pending: queue.SimpleQueue[tuple[int, str]] = queue.SimpleQueue()
+        for item in enumerate(prompts):
+            pending.put(item)
+        results: list[str | Exception] = [None] * len(prompts)  # type: ignore[list-item]
+
+        def _drain() -> None:
+            while True:
+                try:
+                    index, prompt = pending.get_nowait()
+                except queue.Empty:
+                    return
+                results[index] = _query(prompt)
+
+        workers = max(1, min(len(prompts), max_parallel))
+        for future in [_llm_executor.submit(_drain) for _ in range(workers)]:
+            future.result()
+        return results
+
+    def _infer_for_listings(
+        self, listings: Sequence[Listing], build_prompt, label: str, **query_options
+    ) -> list[Optional[str]]:
+        prompts = [build_prompt(listing) for listing in listings]
+        indices = [index for index, prompt in enumerate(prompts) if prompt]
+        results: list[Optional[str]] = [None] * len(listings)
+        if not indices:
+            return results
+
+        logger.info("Leite %s per LLM für %s Anzeigen ein.", label, len(indices))
+        answers = self.query_batch([prompts[index] for index in indices], **query_options)
+        for index, answer in zip(indices, answers):
+            if isinstance(answer, Exception):
+                logger.warning(
+                    "%s fehlgeschlagen für Anzeige %s: %s",
+                    label,
+                    listings[index].title,
+                    answer,
+                )
+                continue
+            results[index] = answer
+        return results
+
+    def infer_genders_for_listings(
+        self, listings: Sequence[Listing]
+    ) -> list[Optional[str]]:
+        """Infer the gender for several listings with parallel requests.
+
+        Listings whose inference fails are reported as ``None``.
+        """
+
+        return self._infer_for_listings(
+            listings, _build_gender_prompt, "Geschlechtsinferenz", stream=True
+        )
+
+    def infer_target_audiences_for_listings(
+        self, listings: Sequence[Listing]
+    ) -> list[Optional[str]]:
+        """Infer the target audience for several listings with parallel requests."""
+
+        return self._infer_for_listings(
+            listings,
+            _build_target_audience_prompt,
+            "Zielgruppeninferenz",
+            normalizer=_normalize_target_audience_output,
+            enforce_confidence=False,
+            fallback="unbekannt",
+            stream=True,
+            options=TARGET_AUDIENCE_OPTIONS,
+        )
+
     def infer_gender_for_listing(self, listing: Listing) -> Optional[str]:
         """Use an LLM to guess the gender when it is missing on the site."""
 
@@ -484,7 +1111,7 @@ class LLMClient:  # pragma: no cover - network-heavy client logic
             listing.title,
         )
         try:
-            return self.query(prompt)
+            return self.query(prompt, stream=True)
         except Exception:
             logger.exception(
                 "Geschlechtsinferenz fehlgeschlagen für Anzeige: %s", listing.title
@@ -513,6 +1140,8 @@ class LLMClient:  # pragma: no cover - network-heavy client logic
                 normalizer=_normalize_target_audience_output,
                 enforce_confidence=False,
                 fallback="unbekannt",
+                stream=True,
+                options=TARGET_AUDIENCE_OPTIONS,
             )
         except Exception:
             logger.exception(
@@ -522,6 +1151,14 @@ class LLMClient:  # pragma: no cover - network-heavy client logic
 
 
 _default_client = LLMClient()
+_default_audience_client = LLMClient(model=model_for_task("target_audience"))
+
+
+@lru_cache(maxsize=8)
+def _get_client(model: str, endpoint: str, timeout: float) -> LLMClient:
+    """Return a shared client for a non-default configuration."""
+
+    return LLMClient(model=model, endpoint=endpoint, timeout=timeout)
 
 
 def infer_gender_for_listing(
@@ -533,9 +1170,10 @@ def infer_gender_for_listing(
 ) -> Optional[str]:
     client = (
         _default_client
-        if (model, endpoint, timeout)
-        == (DEFAULT_MODEL, DEFAULT_ENDPOINT, DEFAULT_TIMEOUT)
-        else LLMClient(model=model, endpoint=endpoint, timeout=timeout)
+        if model is DEFAULT_MODEL
+        and endpoint is DEFAULT_ENDPOINT
+        and timeout == DEFAULT_TIMEOUT
+        else _get_client(model, endpoint, timeout)
     )
     return client.infer_gender_for_listing(listing)
 
@@ -543,14 +1181,81 @@ def infer_gender_for_listing(
 def infer_target_audience_for_listing(
     listing: Listing,
     *,
-    model: str = DEFAULT_MODEL,
+    model: str | None = None,
     endpoint: str = DEFAULT_ENDPOINT,
     timeout: float = DEFAULT_TIMEOUT,
 ) -> Optional[str]:
     client = (
-        _default_client
-        if (model, endpoint, timeout)
-        == (DEFAULT_MODEL, DEFAULT_ENDPOINT, DEFAULT_TIMEOUT)
-        else LLMClient(model=model, endpoint=endpoint, timeout=timeout)
+        _default_audience_client
+        if model is None and endpoint is DEFAULT_ENDPOINT and timeout == DEFAULT_TIMEOUT
+        else _get_client(model or model_for_task("target_audience"), endpoint, timeout)
     )
     return client.infer_target_audience_for_listing(listing)
+
+
+async def ainfer_gender_for_listing(listing: Listing, **kwargs) -> Optional[str]:
+    """Awaitable :func:`infer_gender_for_listing` for the scraper's event loop."""
+
+    return await _run_in_llm_executor(infer_gender_for_listing, listing, **kwargs)
+
+
+async def ainfer_target_audience_for_listing(
+    listing: Listing, **kwargs
+) -> Optional[str]:
+    """Awaitable :func:`infer_target_audience_for_listing`."""
+
+    return await _run_in_llm_executor(infer_target_audience_for_listing, listing, **kwargs)
+
+
+def prepare_default_client() -> None:
+    """Start preparing the default Ollama models in the background."""
+
+    _default_client.prepare()
+    _default_audience_client.prepare()
+
+
+def infer_genders_for_listings(listings: Sequence[Listing]) -> list[Optional[str]]:
+    return _default_client.infer_genders_for_listings(listings)
+
+
+def infer_target_audiences_for_listings(
+    listings: Sequence[Listing],
+) -> list[Optional[str]]:
+    return _default_audience_client.infer_target_audiences_for_listings(listings)
+
+
+async def ainfer_genders(
+    listings: Sequence[Listing],
+    *,
+    max_concurrency: int = DEFAULT_NUM_PARALLEL,
+    model: str = DEFAULT_MODEL,
+    endpoint: str = DEFAULT_ENDPOINT,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> list[tuple[Listing, Optional[str]]]:
+    """Infer genders from a running event loop with bounded concurrency.
+
+    Returns ``(listing, answer)`` pairs in input order. A failing listing is
+    logged and reported as ``None`` without affecting the others.
+    """
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _infer_one(listing: Listing) -> tuple[Listing, Optional[str]]:
+        async with semaphore:
+            try:
+                answer = await ainfer_gender_for_listing(
+                    listing,
+                    model=model,
+                    endpoint=endpoint,
+                    timeout=timeout,
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(
+                    "Geschlechtsinferenz fehlgeschlagen für Anzeige %s: %s",
+                    listing.title,
+                    exc,
+                )
+                answer = None
+        return listing, answer
+
+    return list(await asyncio.gather(*(_infer_one(listing) for listing in listings)))
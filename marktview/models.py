@@ -1,23 +1,33 @@
 """Data models used by the scraper."""
 
+import sys
 from dataclasses import dataclass
 from typing import Optional
 
+# Placeholder for fields the listing does not provide. Interned so that the
+# many listings sharing it reference a single string object.
+NOT_SPECIFIED = sys.intern("nicht angegeben")
 
-@dataclass
+
+@dataclass(slots=True)
 class Listing:
-    """Represents a Markt.de listing."""
+    """Represents a Markt.de listing.
+
+    Instances use ``__slots__``: scraping keeps thousands of them in memory
+    and none needs a per-instance ``__dict__``. The dataclass stays mutable
+    because the gender and target audience are filled in after parsing.
+    """
 
     title: str
     url: str
     postal_code: str = ""
     created_at: Optional[str] = None
     body: Optional[str] = None
-    gender: str = "nicht angegeben"
+    gender: str = NOT_SPECIFIED
     target_audience: str = "unbekannt"
-    financial_interest: str = "nicht angegeben"
-    listing_id: str = "nicht angegeben"
-    username: str = "nicht angegeben"
+    financial_interest: str = NOT_SPECIFIED
+    listing_id: str = NOT_SPECIFIED
+    username: str = NOT_SPECIFIED
 
     def __post_init__(self) -> None:
         self.title = self.title.strip()
@@ -2,19 +2,45 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
-from typing import Iterable, List
+import math
+import operator
+import os
+from array import array
+from typing import Iterable, List, Sequence
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:  # Embedding responses are long float lists; orjson parses them much faster.
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - optional dependency
+    _json_loads = json.loads
 
 from .models import Listing
 
 DEFAULT_MODEL = "qwen3-embedding:0.6b"
 DEFAULT_ENDPOINT = "http://localhost:11434/api/embeddings"
+# Accepts a list of inputs and embeds them in one request (Ollama >= 0.3.4).
+DEFAULT_BATCH_ENDPOINT = "http://localhost:11434/api/embed"
+DEFAULT_BATCH_SIZE = 32
 DEFAULT_TIMEOUT = 15.0
+# Matches the number of requests the Ollama server processes in parallel.
+DEFAULT_CONCURRENCY = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive connections to Ollama are reused across embedding requests; the
+# pool is large enough for the concurrent fan-out of ``aembed_listings``.
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0))
+
+# Batch endpoints the server does not know (plain 404); their texts are sent
+# one by one.
+_unsupported_batch_endpoints: set[str] = set()
+
 
 class OllamaEmbeddingError(RuntimeError):
     """Raised when the Ollama API does not return an embedding."""
@@ -36,10 +62,13 @@ def build_prompt(listing: Listing, *, max_chars: int = 1500) -> str:
         The prompt that will be sent to the embedding endpoint.
     """
 
-    parts: List[str] = [listing.title]
+    # Listing strips its fields already, so the parts are joined as they are.
+    parts: List[str] = [listing.title] if listing.title else []
 
     if listing.body:
-        parts.append(listing.body)
+        # Everything behind max_chars is cut anyway; slicing first avoids
+        # copying very long bodies into the joined prompt.
+        parts.append(listing.body[: max_chars + 1] if max_chars else listing.body)
 
     metadata: List[str] = []
     if listing.postal_code:
@@ -52,7 +81,7 @@ def build_prompt(listing: Listing, *, max_chars: int = 1500) -> str:
     if metadata:
         parts.append(" | ".join(metadata))
 
-    prompt = "\n\n".join(part.strip() for part in parts if part.strip())
+    prompt = "\n\n".join(parts)
     if max_chars and len(prompt) > max_chars:
         prompt = prompt[: max_chars - 1].rstrip() + "…"
 
@@ -68,14 +97,14 @@ def embed_text(
 ) -> List[float]:
     """Create an embedding for a plain text snippet via Ollama."""
 
-    response = requests.post(
+    response = _session.post(
         endpoint,
         json={"model": model, "prompt": text},
         timeout=timeout,
     )
     response.raise_for_status()
 
-    data = response.json()
+    data = _json_loads(response.content)
     embedding = data.get("embedding")
     if not embedding:
         raise OllamaEmbeddingError("Antwort enthält kein Embedding.")
@@ -108,29 +137,188 @@ def embed_listing(
     )
 
 
+def _legacy_endpoint(endpoint: str) -> str | None:
+    """Return the single-prompt endpoint matching a batch ``endpoint``."""
+
+    if endpoint.endswith("/api/embed"):
+        return f"{endpoint}dings"
+    return None
+
+
+def _ollama_error(response: requests.Response) -> str | None:
+    """Return the error message of an Ollama JSON error response, if any.
+
+    Ollama answers unknown routes with a plain-text 404, whereas a known
+    route reports problems such as a missing model as ``{"error": ...}``.
+    """
+
+    try:
+        data = _json_loads(response.content)
+    except ValueError:
+        return None
+    if isinstance(data, dict) and data.get("error"):
+        return str(data["error"])
+    return None
+
+
+def _embed_batch(
+    texts: List[str], *, model: str, endpoint: str, timeout: float
+) -> List[List[float]]:
+    if endpoint.endswith("/api/embeddings"):
+        # Der alte Endpunkt nimmt nur einen Prompt pro Anfrage an.
+        return [
+            embed_text(text, model=model, endpoint=endpoint, timeout=timeout)
+            for text in texts
+        ]
+
+    legacy_endpoint = _legacy_endpoint(endpoint)
+    if endpoint not in _unsupported_batch_endpoints:
+        response = _session.post(
+            endpoint,
+            json={"model": model, "input": texts},
+            timeout=timeout,
+        )
+        error = _ollama_error(response) if response.status_code == 404 else None
+        if error is not None:
+            # Modellspezifisch (z. B. Modell fehlt) – der Endpunkt selbst funktioniert.
+            raise OllamaEmbeddingError(f"Ollama-Fehler: {error}")
+        if response.status_code != 404 or legacy_endpoint is None:
+            response.raise_for_status()
+            embeddings = _json_loads(response.content).get("embeddings")
+            if not embeddings or len(embeddings) != len(texts):
+                raise OllamaEmbeddingError("Antwort enthält nicht für jeden Text ein Embedding.")
+            return embeddings
+
+        logger.info(
+            "Ollama unterstützt %s nicht, nutze stattdessen %s.", endpoint, legacy_endpoint
+        )
+        _unsupported_batch_endpoints.add(endpoint)
+
+    return [
+        embed_text(text, model=model, endpoint=legacy_endpoint, timeout=timeout)
+        for text in texts
+    ]
+
+
+def embed_texts(
+    texts: Iterable[str],
+    *,
+    model: str = DEFAULT_MODEL,
+    endpoint: str = DEFAULT_BATCH_ENDPOINT,
+    timeout: float = DEFAULT_TIMEOUT,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[List[float]]:
+    """Create embeddings for several texts with one request per batch.
+
+    Servers without the ``/api/embed`` endpoint (HTTP 404) are served through
+    the single-prompt ``/api/embeddings`` endpoint instead; passing that
+    endpoint directly sends one request per text.
+    """
+
+    texts = list(texts)
+    batch_size = max(1, batch_size)
+    embeddings: List[List[float]] = []
+    for start in range(0, len(texts), batch_size):
+        embeddings.extend(
+            _embed_batch(
+                texts[start : start + batch_size],
+                model=model,
+                endpoint=endpoint,
+                timeout=timeout,
+            )
+        )
+    return embeddings
+
+
+async def aembed_listings(
+    listings: Iterable[Listing],
+    *,
+    model: str = DEFAULT_MODEL,
+    endpoint: str = DEFAULT_BATCH_ENDPOINT,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_chars: int = 1500,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[tuple[Listing, List[float]]]:
+    """Embed multiple listings in batches with up to ``concurrency`` requests.
+
+    Returns a list of tuples ``(listing, embedding)`` in input order so
+    callers can persist both the original data and the resulting vector.
+    """
+
+    listings = list(listings)
+    prompts = [build_prompt(listing, max_chars=max_chars) for listing in listings]
+    for listing, prompt in zip(listings, prompts):
+        if not prompt:
+            raise OllamaEmbeddingError(
+                f"Listing hat keinen Text für ein Embedding: {listing.listing_id or listing.url}"
+            )
+
+    batch_size = max(1, batch_size)
+    batches = [prompts[start : start + batch_size] for start in range(0, len(prompts), batch_size)]
+    logger.info("Erzeuge Embeddings für %s Anzeigen in %s Anfragen.", len(prompts), len(batches))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _embed_one(batch: List[str]) -> List[List[float]]:
+        async with semaphore:
+            return await asyncio.to_thread(
+                _embed_batch,
+                batch,
+                model=model,
+                endpoint=endpoint,
+                timeout=timeout,
+            )
+
+    results = await asyncio.gather(*(_embed_one(batch) for batch in batches))
+    embeddings = [embedding for batch in results for embedding in batch]
+    return list(zip(listings, embeddings))
+
+
 def embed_listings(
     listings: Iterable[Listing],
     *,
     model: str = DEFAULT_MODEL,
-    endpoint: str = DEFAULT_ENDPOINT,
+    endpoint: str = DEFAULT_BATCH_ENDPOINT,
     timeout: float = DEFAULT_TIMEOUT,
     max_chars: int = 1500,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ) -> List[tuple[Listing, List[float]]]:
-    """Embed multiple listings sequentially.
+    """Synchronous wrapper around :func:`aembed_listings`.
 
-    Returns a list of tuples ``(listing, embedding)`` so callers can
-    persist both the original data and the resulting vector.
+    Must not be called from a running event loop; await
+    :func:`aembed_listings` there instead.
     """
 
-    embedded: List[tuple[Listing, List[float]]] = []
-    for listing in listings:
-        embedding = embed_listing(
-            listing,
+    return asyncio.run(
+        aembed_listings(
+            listings,
             model=model,
             endpoint=endpoint,
             timeout=timeout,
             max_chars=max_chars,
+            concurrency=concurrency,
+            batch_size=batch_size,
         )
-        embedded.append((listing, embedding))
+    )
+
+
+def embedding_array(embedding: Sequence[float]) -> array:
+    """Return ``embedding`` as an L2-normalised, contiguous float32 array.
+
+    The array needs 4 bytes per dimension instead of a boxed float object
+    per value, and with unit length the cosine similarity of two vectors is
+    just their dot product (see :func:`cosine_similarity`).
+    """
+
+    vector = array("f", embedding)
+    norm = math.hypot(*vector)
+    if norm:
+        vector = array("f", [value / norm for value in vector])
+    return vector
+
+
+def cosine_similarity(left: Sequence[float], right: Sequence[float]) -> float:
+    """Return the cosine similarity of two vectors from :func:`embedding_array`."""
 
-    return embedded
+    return sum(map(operator.mul, left, right))
@@ -2,7 +2,13 @@
 
 import asyncio
 import random
+from playwright.async_api import Error as PlaywrightError
 from playwright.async_api import Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# Tracking-Beacons halten das Netzwerk oft bis zu Playwrights Standardlimit von
+# 30 Sekunden beschäftigt; die Inhalte stehen dann längst bereit.
+NETWORK_IDLE_TIMEOUT_MS = 3000
 
 
 async def accept_cookies(page: Page) -> None:
@@ -10,13 +16,20 @@ async def accept_cookies(page: Page) -> None:
 
     try:
         cookie_buttons = page.get_by_role("button", name="AKZEPTIEREN UND WEITER")
-        for index in range(await cookie_buttons.count()):
-            cookie_button = cookie_buttons.nth(index)
-            if await cookie_button.is_visible(timeout=5000):
+        buttons = [cookie_buttons.nth(index) for index in range(await cookie_buttons.count())]
+        # Alle Knöpfe gleichzeitig prüfen; ein fehlgeschlagener zählt als unsichtbar.
+        # ``is_visible`` wartet nicht: markt.de liefert die Dialoge mit dem
+        # initialen HTML aus, das beim Aufruf bereits geladen ist.
+        visible = await asyncio.gather(
+            *(button.is_visible() for button in buttons),
+            return_exceptions=True,
+        )
+        for cookie_button, is_visible in zip(buttons, visible):
+            if is_visible is True:
                 await cookie_button.click()
                 print("[INFO] Cookie-Banner akzeptiert.")
                 break
-    except Exception as exc:  # noqa: BLE001
+    except PlaywrightError as exc:
         print(f"[WARN] Cookie-Banner Fehler: {exc}")
 
 
@@ -25,17 +38,39 @@ async def confirm_age(page: Page) -> None:
 
     try:
         age_button = page.locator("#btn-over-eighteen")
-        if await age_button.is_visible(timeout=5000):
+        if await age_button.is_visible():
             await age_button.click()
             print("[INFO] Altersverifikation durchgeführt.")
-    except Exception as exc:  # noqa: BLE001
+    except PlaywrightError as exc:
         print(f"[WARN] Altersverifikation Fehler: {exc}")
 
 
+async def handle_intro_dialogs(page: Page) -> None:
+    """Dismiss the cookie banner and the age gate concurrently.
+
+    Both probes are independent, so their round trips to the browser
+    overlap. An unexpected error in one of them does not stop the other.
+    """
+
+    results = await asyncio.gather(
+        accept_cookies(page), confirm_age(page), return_exceptions=True
+    )
+    for name, result in zip(("Cookie-Banner", "Altersverifikation"), results):
+        if isinstance(result, BaseException):
+            print(f"[WARN] {name} unerwarteter Fehler: {result!r}")
+
+
 async def wait_for_page_ready(page: Page, *, delay: float = 1.0) -> None:
-    """Wait until the page reports network idle and give it a little extra time."""
+    """Wait until the page reports network idle and give it a little extra time.
+
+    Network idle is only awaited for ``NETWORK_IDLE_TIMEOUT_MS``; after that
+    the parsed document is considered good enough.
+    """
 
-    await page.wait_for_load_state("networkidle")
+    try:
+        await page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_TIMEOUT_MS)
+    except PlaywrightTimeoutError:
+        await page.wait_for_load_state("domcontentloaded")
     jitter = random.uniform(0.1, 2.0)
     total_delay = delay + jitter if delay > 0 else jitter
     await asyncio.sleep(total_delay)
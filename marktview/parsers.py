@@ -1,34 +1,81 @@
 """Parsing helpers for Markt.de listings."""
 
 import re
-from typing import List, Optional
+from typing import List
 
 from playwright.async_api import Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from .models import Listing
 
+TILE_SELECTOR = "li.clsy-c-result-list-item"
+DETAILS_READY_SELECTOR = "div.clsy-c-expose-details__location"
+BASE_URL = "https://erotik.markt.de"
+# Werbekacheln verlinken auf diesen Host statt auf eine Anzeige.
+_AD_HOST = "feed.solads.media"
+_POSTAL_RE = re.compile(r"\b\d{5}\b")
+# Attribute list labels (lower case, soft hyphens removed) and the listing
+# fields they fill.
+_LABEL_FIELDS = {
+    "geschlecht": "gender",
+    "interesse an geld": "financial_interest",
+    "anzeigenkennung": "listing_id",
+}
+_LABEL_RE = re.compile("(" + "|".join(map(re.escape, _LABEL_FIELDS)) + ")")
+
+# Each Playwright call is a round trip to the browser process, so the tile
+# attributes and the detail page fields are read with a single call each.
+_TILE_ATTRIBUTES_JS = """
+els => els.map(e => [
+    e.getAttribute("title") || "",
+    e.getAttribute("data-onclick-url") || "",
+])
+"""
+_DETAILS_JS = """
+() => {
+    const text = selector => document.querySelector(selector)?.innerText ?? null;
+    // Labels and descriptions in document order; a description belongs to
+    // the label right before it, so a missing value cannot shift the pairs.
+    const attributes = [];
+    let label = null;
+    for (const e of document.querySelectorAll(
+        "span.clsy-attribute-list__label, span.clsy-attribute-list__description"
+    )) {
+        if (e.classList.contains("clsy-attribute-list__label")) {
+            label = e.innerText;
+        } else if (label !== null) {
+            attributes.push([label, e.innerText]);
+            label = null;
+        }
+    }
+    return {
+        location: text("div.clsy-c-expose-details__location"),
+        date: text("div.clsy-c-expose-details__date"),
+        body: text("div#clsy-c-expose-body"),
+        username: text("div.clsy-c-userbox__profile-name"),
+        attributes,
+    };
+}
+"""
+
 
 async def parse_listings(page: Page) -> List[Listing]:
     """Parse all listing tiles on the current result page."""
 
     listings: List[Listing] = []
-    elements = page.locator("li.clsy-c-result-list-item")
-
-    count = await elements.count()
-    for index in range(count):
-        element = elements.nth(index)
-        title = await element.get_attribute("title") or ""
-        onclick = await element.get_attribute("data-onclick-url") or ""
+    append = listings.append
+    tiles = await page.locator(TILE_SELECTOR).evaluate_all(_TILE_ATTRIBUTES_JS)
 
+    for title, onclick in tiles:
         if not title.strip() or not onclick.strip():
             continue
 
-        full_url = f"https://erotik.markt.de{onclick}"
-        if "feed.solads.media" in full_url.lower():
+        # Die Basis-URL enthält den Werbe-Host nie, ``onclick`` genügt.
+        if _AD_HOST in onclick.lower():
             print(f"[INFO] Anzeige übersprungen (Werbung): {title}")
             continue
 
-        listings.append(Listing(title=title, url=full_url))
+        append(Listing(title=title, url=BASE_URL + onclick))
 
     return listings
 
@@ -36,44 +83,32 @@ async def parse_listings(page: Page) -> List[Listing]:
 async def parse_listing_details(page: Page, listing: Listing) -> None:
     """Populate detail data for a given listing using its detail page."""
 
-    await page.goto(listing.url)
-    await page.wait_for_load_state("networkidle")
-    await page.wait_for_timeout(1000)
+    # Die Felder stehen im serverseitig gerenderten HTML; auf Netzwerkruhe
+    # (Tracking, Werbung) muss dafür nicht gewartet werden.
+    await page.goto(listing.url, wait_until="domcontentloaded")
+    try:
+        await page.wait_for_selector(DETAILS_READY_SELECTOR, timeout=5000)
+    except PlaywrightTimeoutError:
+        pass
 
-    location_text = await _safe_inner_text(page, "div.clsy-c-expose-details__location")
+    details = await page.evaluate(_DETAILS_JS)
+
+    location_text = details["location"]
     if location_text:
-        match = re.search(r"\b\d{5}\b", location_text)
+        match = _POSTAL_RE.search(location_text)
         listing.postal_code = match.group(0) if match else ""
 
-    created_at_text = await _safe_inner_text(page, "div.clsy-c-expose-details__date")
+    created_at_text = details["date"]
     listing.created_at = created_at_text.strip() if created_at_text else None
 
-    body_text = await _safe_inner_text(page, "div#clsy-c-expose-body")
+    body_text = details["body"]
     listing.body = body_text.strip() if body_text else None
 
-    username = await _safe_inner_text(page, "div.clsy-c-userbox__profile-name")
+    username = details["username"]
     if username:
         listing.username = username.strip()
 
-    labels = await page.locator("span.clsy-attribute-list__label").all_inner_texts()
-    descriptions = await page.locator("span.clsy-attribute-list__description").all_inner_texts()
-
-    for label, value in zip(labels, descriptions):
-        normalized_label = label.replace("\u00AD", "").strip().lower()
-        cleaned_value = value.strip()
-
-        if "geschlecht" in normalized_label:
-            listing.gender = cleaned_value
-        elif "interesse an geld" in normalized_label:
-            listing.financial_interest = cleaned_value
-        elif "anzeigenkennung" in normalized_label:
-            listing.listing_id = cleaned_value
-
-
-async def _safe_inner_text(page: Page, selector: str) -> Optional[str]:
-    """Return inner text for ``selector``; suppresses locator errors."""
-
-    try:
-        return await page.locator(selector).inner_text()
-    except Exception:  # noqa: BLE001
-        return None
+    for label, value in details["attributes"]:
+        match = _LABEL_RE.search(label.replace("\u00AD", "").lower())
+        if match:
+            setattr(listing, _LABEL_FIELDS[match.group(1)], value.strip())
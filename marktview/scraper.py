@@ -2,70 +2,268 @@
 
 import asyncio
 import logging
+import re
+import weakref
+from itertools import compress
 from pathlib import Path
-from typing import List, Set
-
-from playwright.async_api import BrowserContext
-
-from .config import NETWORK_IDLE_DELAY, PAGE_READY_DELAY
-from .excel_writer import write_listings_to_excel
-from .llm import infer_gender_for_listing, infer_target_audience_for_listing
-from .models import Listing
-from .page_actions import accept_cookies, confirm_age, wait_for_page_ready
+from typing import List, Sequence, Set
+
+from playwright.async_api import BrowserContext, Page, Route
+from playwright.async_api import Error as PlaywrightError
+
+from .config import (
+    BLOCKED_RESOURCE_EXTENSIONS,
+    BLOCKED_RESOURCE_TYPES,
+    NETWORK_IDLE_DELAY,
+    PAGE_READY_DELAY,
+    PROGRESS_FLUSH_AFTER,
+)
+from .excel_writer import (
+    append_listings_csv,
+    load_existing_listing_ids,
+    write_listings_to_excel,
+)
+from .llm import ainfer_gender_for_listing, ainfer_target_audience_for_listing
+from .models import NOT_SPECIFIED, Listing
+from .page_actions import handle_intro_dialogs, wait_for_page_ready
 from .parsers import parse_listing_details, parse_listings
 
 logger = logging.getLogger(__name__)
 
+# Listing IDs appear in detail URLs as a whole path or query token, with or
+# without inner hyphens.
+_URL_TOKEN_RE = re.compile(r"\w+")
+_URL_HYPHENATED_TOKEN_RE = re.compile(r"[\w-]+")
+
+
+def _is_known_listing(listing: Listing, known_listing_ids: Set[str]) -> bool:
+    """Return whether the URL of ``listing`` contains a known listing ID.
+
+    The URL is split into its tokens once, so the usual check costs a few
+    hash lookups instead of a substring search per known ID. Unlike a regular
+    expression built from all known IDs, nothing has to be recompiled when
+    new IDs are added during a run. IDs glued to other text (``id_123``)
+    form no token of their own; only then are all IDs searched as substrings.
+    """
+
+    if not known_listing_ids:
+        return False
+
+    url = listing.url
+    if not (
+        known_listing_ids.isdisjoint(_URL_TOKEN_RE.findall(url))
+        and known_listing_ids.isdisjoint(_URL_HYPHENATED_TOKEN_RE.findall(url))
+    ):
+        return True
+    return any(listing_id in url for listing_id in known_listing_ids)
+
 
 async def _populate_listing(
-    context: BrowserContext,
+    page: Page,
     listing: Listing,
-    concurrency: asyncio.Semaphore,
     known_listing_ids: Set[str],
-) -> None:  # pragma: no cover - requires live browser
-    async with concurrency:
-        detail_page = await context.new_page()
-        try:
-            logger.info("Lade Details für: %s", listing.title)
-            await parse_listing_details(detail_page, listing)
-            await asyncio.sleep(NETWORK_IDLE_DELAY)
-
-            if listing.gender.lower() == "nicht angegeben":
-                try:
-                    llm_gender = await asyncio.to_thread(
-                        infer_gender_for_listing,
-                        listing,
-                    )
-                    if llm_gender:
-                        listing.gender = llm_gender
-                except Exception as exc:  # noqa: BLE001
-                    logger.warning(
-                        "Geschlecht konnte nicht per LLM ermittelt werden: %s", exc,
-                        exc_info=True,
-                    )
+) -> bool:  # pragma: no cover - requires live browser
+    """Fetch the details of ``listing`` and let the LLM fill the gaps.
 
-                if listing.gender.lower() == "nicht angegeben":
-                    listing.gender = "unbekannt 50%"
+    Returns ``False`` for a listing whose ID turns out to be known already;
+    it is neither sent to the LLM nor meant to be stored again.
+    """
 
-            try:
-                audience = await asyncio.to_thread(
-                    infer_target_audience_for_listing,
-                    listing,
+    try:
+        logger.info("Lade Details für: %s", listing.title)
+        await parse_listing_details(page, listing)
+
+        listing_id = listing.listing_id
+        if listing_id and listing_id != NOT_SPECIFIED:
+            if listing_id in known_listing_ids:
+                logger.info(
+                    "Anzeige übersprungen (Kennung bereits vorhanden): %s", listing.title
                 )
-                if audience:
-                    listing.target_audience = audience
-            except Exception as exc:  # noqa: BLE001
+                return False
+            # Sofort vormerken, damit parallel geladene Dubletten sie sehen.
+            known_listing_ids.add(listing_id)
+
+        # Beide Fragen sind unabhängig voneinander und gehen parallel an
+        # den LLM-Server.
+        gender_missing = listing.gender.lower() == NOT_SPECIFIED
+        inferences = [ainfer_target_audience_for_listing(listing)]
+        if gender_missing:
+            inferences.append(ainfer_gender_for_listing(listing))
+        audience, *gender = await asyncio.gather(*inferences, return_exceptions=True)
+
+        if isinstance(audience, Exception):
+            logger.warning(
+                "Zielgruppe konnte nicht per LLM ermittelt werden: %s", audience,
+                exc_info=audience,
+            )
+        elif audience:
+            listing.target_audience = audience
+
+        if gender_missing:
+            llm_gender = gender[0]
+            if isinstance(llm_gender, Exception):
                 logger.warning(
-                    "Zielgruppe konnte nicht per LLM ermittelt werden: %s", exc,
-                    exc_info=True,
+                    "Geschlecht konnte nicht per LLM ermittelt werden: %s", llm_gender,
+                    exc_info=llm_gender,
                 )
+            elif llm_gender:
+                listing.gender = llm_gender
+
+            if listing.gender.lower() == NOT_SPECIFIED:
+                listing.gender = "unbekannt 50%"
+    except Exception as exc:  # noqa: BLE001
+        # Eine fehlerhafte Anzeige darf die übrigen Anzeigen der Seite nicht
+        # mitreißen; ``CancelledError`` wird hier nicht abgefangen.
+        logger.warning("Fehler bei %s: %s", listing.title, exc, exc_info=True)
+    return True
+
+
+async def _abort_heavy_resources(route: Route) -> None:
+    """Abort requests for resources the parsers never look at."""
+
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# Only URLs ending in an extension of a blocked type reach the route handler;
+# Playwright hands the pattern to the browser, so every other request is
+# served without a round trip through Python.
+_BLOCKED_URL_RE = re.compile(
+    r"\.(?:"
+    + "|".join(
+        extension
+        for resource_type in sorted(BLOCKED_RESOURCE_TYPES)
+        for extension in BLOCKED_RESOURCE_EXTENSIONS.get(resource_type, ())
+    )
+    + r")(?:[?#]|$)",
+    re.IGNORECASE,
+)
+
+# Contexts that already carry the route handler. The loop mode passes the same
+# context to ``scrape_pages`` for many cycles; a second handler would run
+# every request through the route twice.
+_routed_contexts: "weakref.WeakSet[BrowserContext]" = weakref.WeakSet()
+
+
+async def _block_heavy_resources(context: BrowserContext) -> None:
+    """Stop ``context`` from downloading images, fonts and media.
+
+    Persistent contexts are left alone: routing would switch off the HTTP
+    cache that the profile keeps between runs.
+    """
+
+    if (
+        BLOCKED_RESOURCE_TYPES
+        and getattr(context, "browser", None) is not None
+        and context not in _routed_contexts
+    ):
+        await context.route(_BLOCKED_URL_RE, _abort_heavy_resources)
+        _routed_contexts.add(context)
+
+
+async def open_detail_contexts(
+    context: BrowserContext, size: int
+) -> List[BrowserContext]:
+    """Return ``context`` plus ``size - 1`` siblings sharing its cookies.
+
+    Persistent contexts have no browser to open siblings from; their pages
+    share the one context instead.
+    """
+
+    if size <= 1:
+        return [context]
+
+    browser = getattr(context, "browser", None)
+    if browser is None:
+        return [context] * size
+
+    state = await context.storage_state()
+    siblings = await asyncio.gather(
+        *(browser.new_context(storage_state=state) for _ in range(size - 1))
+    )
+    await asyncio.gather(*(_block_heavy_resources(sibling) for sibling in siblings))
+    return [context, *siblings]
+
+
+async def close_detail_contexts(contexts: Sequence[BrowserContext]) -> None:
+    """Close the siblings opened by ``open_detail_contexts``.
+
+    The first entry is the caller's main context and stays open.
+    """
+
+    if not contexts:
+        return
+    main_context = contexts[0]
+    await asyncio.gather(
+        *(sibling.close() for sibling in contexts[1:] if sibling is not main_context)
+    )
+
 
-            if listing.listing_id:
-                known_listing_ids.add(listing.listing_id)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("Fehler bei %s: %s", listing.title, exc, exc_info=True)
-        finally:
-            await detail_page.close()
+async def _advance_to_next_page(page) -> bool:
+    """Click the pagination button and wait for the next result page.
+
+    Returns ``False`` when there is no further page.
+    """
+
+    next_button = page.locator("button.clsy-c-pagination__next")
+    # Die Ergebnisseite ist bereits geladen; fehlt der Knopf, gibt es keine
+    # weitere Seite, ohne dass auf ihn gewartet werden muss.
+    try:
+        is_visible = await next_button.count() > 0 and await next_button.is_visible()
+    except PlaywrightError:
+        is_visible = False
+
+    if not is_visible:
+        return False
+
+    # Auf das Laden der Folgeseite wartet ``wait_for_page_ready``.
+    await next_button.click(no_wait_after=True)
+    await wait_for_page_ready(page, delay=NETWORK_IDLE_DELAY)
+    return True
+
+
+async def _open_detail_pages(contexts: Sequence[BrowserContext]) -> List[Page]:
+    """Open one long-lived detail page per entry of ``contexts``."""
+
+    return list(await asyncio.gather(*(context.new_page() for context in contexts)))
+
+
+def _page_pool(pages: Sequence[Page]) -> "asyncio.Queue[Page]":
+    """Return a queue handing out ``pages`` to detail page tasks."""
+
+    pool: asyncio.Queue[Page] = asyncio.Queue()
+    for page in pages:
+        pool.put_nowait(page)
+    return pool
+
+
+async def _populate_from_pool(
+    pages: "asyncio.Queue[Page]",
+    listing: Listing,
+    known_listing_ids: Set[str],
+) -> bool:
+    """Check out a detail page, populate ``listing`` and return the page.
+
+    The pool holds one page per allowed concurrent fetch, so waiting for a
+    free page also limits the number of detail requests in flight.
+    """
+
+    page = await pages.get()
+    try:
+        return await _populate_listing(page, listing, known_listing_ids)
+    finally:
+        if page.is_closed():
+            # Abgestürzte Seiten werden ersetzt, damit der Pool nicht schrumpft.
+            # Ein Fehler dabei darf die ursprüngliche Ausnahme nicht verdecken;
+            # die geschlossene Seite bleibt dann im Pool und der nächste
+            # Abruf versucht es erneut.
+            try:
+                page = await page.context.new_page()
+            except PlaywrightError as exc:
+                logger.warning("Detailseite konnte nicht ersetzt werden: %s", exc)
+        pages.put_nowait(page)
 
 
 async def scrape_pages(
@@ -80,8 +278,19 @@ async def scrape_pages(
     start_headless: bool = True,
     auto_hide_after: int | None = 10,
     resources: list[object] | None = None,
+    detail_contexts: list[BrowserContext] | None = None,
 ) -> List[Listing]:  # pragma: no cover - orchestrates browser automation
-    """Scrape multiple listing pages starting from ``start_url``."""
+    """Scrape multiple listing pages starting from ``start_url``.
+
+    Without ``known_listing_ids`` the IDs stored in an existing Excel
+    ``progress_path`` are loaded, so listings from earlier runs are skipped
+    before their detail pages are opened.
+
+    ``detail_contexts`` is a pool from ``open_detail_contexts(context, ...)``
+    that outlives this call and stays open. The headless switch refills it
+    in place with contexts of the new browser. Without it a pool is opened
+    for this call only.
+    """
 
     async def _close_resource(resource: object) -> None:
         maybe_close = getattr(resource, "close", None)
@@ -90,108 +299,164 @@ async def scrape_pages(
             if asyncio.iscoroutine(maybe_coro):
                 await maybe_coro
 
+    async def _close_pool_pages(pages: "asyncio.Queue[Page]") -> None:
+        # Der Pool enthält auch Seiten, die einen abgestürzten Tab ersetzt haben.
+        open_pages = []
+        while not pages.empty():
+            open_pages.append(pages.get_nowait())
+        await asyncio.gather(*(_close_resource(p) for p in open_pages))
+
     resources = resources or []
     browser_hidden = start_headless
     current_context = context
 
+    await _block_heavy_resources(current_context)
     page = await current_context.new_page()
 
     await page.goto(start_url)
     await wait_for_page_ready(page, delay=PAGE_READY_DELAY)
 
-    await accept_cookies(page)
-    await confirm_age(page)
+    await handle_intro_dialogs(page)
 
     await page.goto(start_url)
     await wait_for_page_ready(page, delay=PAGE_READY_DELAY)
 
+    owns_detail_contexts = detail_contexts is None
+    if detail_contexts is None:
+        detail_contexts = await open_detail_contexts(current_context, concurrency_limit)
+    # Je erlaubtem gleichzeitigem Detailabruf eine Seite, die über alle
+    # Ergebnisseiten hinweg wiederverwendet wird.
+    page_pool = _page_pool(await _open_detail_pages(detail_contexts))
+
     all_listings: List[Listing] = []
-    known_listing_ids = known_listing_ids or set()
+    if known_listing_ids is None:
+        known_listing_ids = (
+            load_existing_listing_ids(progress_path)
+            if progress_path and Path(progress_path).suffix == ".xlsx"
+            else set()
+        )
     processed_count = 0
     added_count = 0
     current_page = 0
-
-    while current_page < max_pages:
-        logger.info("Verarbeite Seite %s", current_page + 1)
-        await wait_for_page_ready(page, delay=NETWORK_IDLE_DELAY)
-
-        listings = await parse_listings(page)
-        if not listings:
-            dump_path = Path(f"dump_page_{current_page + 1}.html")
-            dump_path.write_text(await page.content(), encoding="utf-8")
-            logger.warning(
-                "Keine Anzeigen gefunden – Dump gespeichert: %s", dump_path
+    # Jeder Excel-Zwischenstand schreibt die ganze Arbeitsmappe neu, daher
+    # werden neue Anzeigen gesammelt und erst blockweise gespeichert.
+    pending_listings: List[Listing] = []
+
+    def _flush_pending() -> None:
+        if pending_listings:
+            write_listings_to_excel(pending_listings, progress_path)
+            pending_listings.clear()
+
+    try:
+        while current_page < max_pages:
+            logger.info("Verarbeite Seite %s", current_page + 1)
+
+            listings = await parse_listings(page)
+            if not listings:
+                dump_path = Path(f"dump_page_{current_page + 1}.html")
+                dump_path.write_text(await page.content(), encoding="utf-8")
+                logger.warning(
+                    "Keine Anzeigen gefunden – Dump gespeichert: %s", dump_path
+                )
+                break
+
+            processed_count += len(listings)
+            filtered_listings: List[Listing] = []
+            for listing in listings:
+                if _is_known_listing(listing, known_listing_ids):
+                    logger.info(
+                        "Anzeige übersprungen (bereits vorhanden): %s", listing.title
+                    )
+                    continue
+                filtered_listings.append(listing)
+
+            # Die nächste Ergebnisseite lädt, während die Detailseiten dieser
+            # Seite abgearbeitet werden; die Anzeigen sind bereits ausgelesen.
+            next_page = (
+                asyncio.create_task(_advance_to_next_page(page))
+                if current_page + 1 < max_pages
+                else None
             )
-            break
 
-        processed_count += len(listings)
-        filtered_listings: List[Listing] = []
-        for listing in listings:
-            if any(
-                listing_id and listing_id in listing.url for listing_id in known_listing_ids
+            if not filtered_listings:
+                logger.info("Alle Anzeigen auf dieser Seite sind bereits vorhanden.")
+            else:
+                # Detailseiten und LLM-Aufrufe warten fast nur auf I/O; der
+                # Seitenpool begrenzt, wie viele davon gleichzeitig laufen.
+                try:
+                    is_new = await asyncio.gather(
+                        *(
+                            _populate_from_pool(page_pool, listing, known_listing_ids)
+                            for listing in filtered_listings
+                        )
+                    )
+                except BaseException:
+                    if next_page is not None:
+                        next_page.cancel()
+                    raise
+                filtered_listings = list(compress(filtered_listings, is_new))
+
+                all_listings.extend(filtered_listings)
+                added_count += len(filtered_listings)
+
+                if progress_path and Path(progress_path).suffix == ".csv":
+                    # Loop-Modus: Zwischenstand nur an die CSV-Delta-Datei anhängen.
+                    # Die Kennungen stehen nach dem Detailabruf bereits in
+                    # ``known_listing_ids`` und dürfen hier nicht gefiltert werden.
+                    append_listings_csv(filtered_listings, progress_path)
+                elif progress_path:
+                    pending_listings.extend(filtered_listings)
+                    if len(pending_listings) >= PROGRESS_FLUSH_AFTER:
+                        _flush_pending()
+
+            has_next_page = await next_page if next_page is not None else False
+            if not has_next_page:
+                if next_page is not None:
+                    logger.info("Keine weitere Seite gefunden.")
+                break
+
+            # Ein Wechsel des Browsers öffnet ``page.url`` – das ist jetzt
+            # bereits die nächste Ergebnisseite.
+            if (
+                not browser_hidden
+                and auto_hide_after is not None
+                and added_count >= auto_hide_after
+                and playwright is not None
             ):
                 logger.info(
-                    "Anzeige übersprungen (bereits vorhanden): %s", listing.title
+                    "Schalte nach %s Anzeigen in den versteckten Headless-Modus um.",
+                    auto_hide_after,
                 )
-                continue
-            filtered_listings.append(listing)
-
-        if not filtered_listings:
-            logger.info("Alle Anzeigen auf dieser Seite sind bereits vorhanden.")
-        else:
-            semaphore = asyncio.Semaphore(concurrency_limit)
-            for listing in filtered_listings:
-                # Stelle sicher, dass die nächste Anzeige erst verarbeitet wird,
-                # wenn die optionale Geschlechtsbestimmung per LLM abgeschlossen ist.
-                await _populate_listing(
-                    current_context, listing, semaphore, known_listing_ids
-                )
-
-            all_listings.extend(filtered_listings)
-            added_count += len(filtered_listings)
-
-            if progress_path:
-                write_listings_to_excel(filtered_listings, progress_path)
-
-        if (
-            not browser_hidden
-            and auto_hide_after is not None
-            and added_count >= auto_hide_after
-            and playwright is not None
-        ):
-            logger.info(
-                "Schalte nach %s Anzeigen in den versteckten Headless-Modus um.",
-                auto_hide_after,
-            )
-
-            current_url = page.url
-
-            await page.close()
-            await _close_resource(current_context)
-            await _close_resource(current_context.browser)
 
-            hidden_browser = await playwright.chromium.launch(headless=True)
-            hidden_context = await hidden_browser.new_context()
-            resources.extend([hidden_context, hidden_browser])
-            current_context = hidden_context
-            browser_hidden = True
-
-            page = await current_context.new_page()
-            await page.goto(current_url)
-            await wait_for_page_ready(page, delay=PAGE_READY_DELAY)
-
-        next_button = page.locator("button.clsy-c-pagination__next")
-        try:
-            is_visible = await next_button.is_visible(timeout=3000)
-        except Exception:  # noqa: BLE001
-            is_visible = False
-
-        if not is_visible:
-            logger.info("Keine weitere Seite gefunden.")
-            break
+                current_url = page.url
+
+                await page.close()
+                await _close_pool_pages(page_pool)
+                await close_detail_contexts(detail_contexts)
+                await _close_resource(current_context)
+                await _close_resource(current_context.browser)
+
+                hidden_browser = await playwright.chromium.launch(headless=True)
+                hidden_context = await hidden_browser.new_context()
+                await _block_heavy_resources(hidden_context)
+                resources.extend([hidden_context, hidden_browser])
+                current_context = hidden_context
+                browser_hidden = True
+
+                page = await current_context.new_page()
+                await page.goto(current_url)
+                await wait_for_page_ready(page, delay=PAGE_READY_DELAY)
+                # Die Liste wird ersetzt, nicht neu gebunden: ein vom Aufrufer
+                # übergebener Pool zeigt danach auf den neuen Browser.
+                detail_contexts[:] = await open_detail_contexts(
+                    current_context, concurrency_limit
+                )
+                page_pool = _page_pool(await _open_detail_pages(detail_contexts))
 
-        await next_button.click()
-        current_page += 1
+            current_page += 1
+    finally:
+        # Auch bei Abbruch nichts verlieren, was bereits abgerufen wurde.
+        _flush_pending()
 
     logger.info(
         "Lauf abgeschlossen: %s Anzeigen verarbeitet, %s zur Liste hinzugefügt.",
@@ -200,4 +465,7 @@ async def scrape_pages(
     )
 
     await page.close()
+    await _close_pool_pages(page_pool)
+    if owns_detail_contexts:
+        await close_detail_contexts(detail_contexts)
     return all_listings
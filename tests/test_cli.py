@@ -1,11 +1,15 @@
 import asyncio
+import os
+import signal
+import subprocess
 import sys
 from pathlib import Path
 from types import SimpleNamespace
 
+import openpyxl
 import pytest
 
-from marktview import cli, config
+from marktview import cli, config, excel_writer, llm, scraper
 from marktview.models import Listing
 
 
@@ -53,12 +57,14 @@ async def test_run_once_writes_results(monkeypatch, tmp_path):
         max_pages=1,
         concurrency=1,
         headless=True,
+        user_data_dir=None,
     )
 
-    monkeypatch.setattr(cli, "async_playwright", lambda: playwright)
-    monkeypatch.setattr(cli, "load_existing_listing_ids", lambda path: set())
+    monkeypatch.setattr(cli, "_playwright", lambda: playwright)
+    monkeypatch.setattr(llm, "prepare_default_client", lambda: None)
+    monkeypatch.setattr(excel_writer, "load_existing_listing_ids", lambda path: set())
     monkeypatch.setattr(
-        cli,
+        scraper,
         "scrape_pages",
         lambda *a, **k: asyncio.sleep(0, result=listings),
     )
@@ -66,6 +72,37 @@ async def test_run_once_writes_results(monkeypatch, tmp_path):
     assert output.exists()
 
 
+@pytest.mark.asyncio
+async def test_run_once_writes_listings_without_id_once(monkeypatch, tmp_path):
+    listings = [
+        Listing(title="Ohne Kennung", url="https://example.com/a"),
+        Listing(title="Mit Kennung", url="https://example.com/b", listing_id="42"),
+    ]
+    playwright = DummyPlaywright(DummyBrowser(DummyContext(listings)))
+    args = SimpleNamespace(
+        output=tmp_path / "out.xlsx",
+        start_url="https://start",
+        max_pages=1,
+        concurrency=1,
+        headless=True,
+        user_data_dir=None,
+    )
+
+    async def fake_scrape_pages(context, start_url, **kwargs):  # noqa: ARG001
+        # The real scraper flushes its listings into the progress file.
+        excel_writer.write_listings_to_excel(listings, kwargs["progress_path"])
+        return listings
+
+    monkeypatch.setattr(cli, "_playwright", lambda: playwright)
+    monkeypatch.setattr(llm, "prepare_default_client", lambda: None)
+    monkeypatch.setattr(scraper, "scrape_pages", fake_scrape_pages)
+
+    output = await cli.run_once(args)
+
+    worksheet = openpyxl.load_workbook(output).active
+    assert worksheet.max_row == 1 + len(listings)
+
+
 def test_configure_utf8_output_handles_missing_reconfigure(monkeypatch):
     stream = SimpleNamespace()
     monkeypatch.setattr(sys, "stdout", stream)
@@ -76,12 +113,16 @@ def test_configure_utf8_output_handles_missing_reconfigure(monkeypatch):
 def test_clear_artifacts(tmp_path):
     output_path = tmp_path / "file.txt"
     output_path.write_text("data")
+    (tmp_path / "file.ids.json").write_text("[]")
+    (tmp_path / "file.delta.csv").write_text("")
     log_dir = tmp_path / "log"
     log_dir.mkdir()
     (log_dir / "a.log").write_text("log")
 
     cli.clear_artifacts(output_path, log_dir)
     assert not output_path.exists()
+    assert not (tmp_path / "file.ids.json").exists()
+    assert not (tmp_path / "file.delta.csv").exists()
     assert not log_dir.exists()
 
 
@@ -112,7 +153,7 @@ def test_main_clear(monkeypatch, tmp_path):
 
     monkeypatch.setattr(cli, "parse_args", lambda: args)
     monkeypatch.setattr(cli, "configure_utf8_output", lambda: called.setdefault("utf8", True))
-    monkeypatch.setattr(cli, "configure_llm_logging", lambda log_dir: called.setdefault("llm", log_dir))
+    monkeypatch.setattr(llm, "configure_llm_logging", lambda log_dir: called.setdefault("llm", log_dir))
     monkeypatch.setattr(cli, "clear_artifacts", lambda output, log_dir: called.setdefault("cleared", (output, log_dir)))
 
     cli.main()
@@ -134,11 +175,195 @@ def test_main_runs_once(monkeypatch, tmp_path):
 
     monkeypatch.setattr(cli, "parse_args", lambda: args)
     monkeypatch.setattr(cli, "configure_utf8_output", lambda: None)
-    monkeypatch.setattr(cli, "configure_llm_logging", lambda log_dir: called.setdefault("llm", log_dir))
+    monkeypatch.setattr(llm, "configure_llm_logging", lambda log_dir: called.setdefault("llm", log_dir))
     monkeypatch.setattr(cli.logging, "basicConfig", lambda **kwargs: called.setdefault("logging", kwargs))
-    monkeypatch.setattr(cli, "run_once", lambda args: "done")
+    monkeypatch.setattr(cli, "install_uvloop", lambda: called.setdefault("uvloop", True))
+    monkeypatch.setattr(cli, "run_once", lambda args, output_path: (args, output_path))
     monkeypatch.setattr(cli.asyncio, "run", lambda coro: called.setdefault("ran", coro))
 
     cli.main()
 
-    assert called["ran"] == "done"
+    assert called["ran"] == (args, tmp_path / "out.xlsx")
+    assert called["uvloop"] is True
+
+
+@pytest.mark.asyncio
+async def test_scrape_cycle_reuses_open_browser(monkeypatch, tmp_path):
+    context = DummyContext([])
+    browser = DummyBrowser(context)
+    playwright = DummyPlaywright(browser)
+    resources: list[object] = []
+    seen = {}
+
+    async def fake_scrape_pages(ctx, *args, **kwargs):
+        seen["context"] = ctx
+        seen["headless"] = kwargs["start_headless"]
+        return []
+
+    monkeypatch.setattr(scraper, "scrape_pages", fake_scrape_pages)
+    args = SimpleNamespace(start_url="https://start", max_pages=1, concurrency=1, headless=False)
+
+    await cli.open_browser(playwright, headless=False, resources=resources)
+    await cli.scrape_cycle(playwright, args, tmp_path / "out.xlsx", set(), resources)
+
+    assert seen == {"context": context, "headless": False}
+    assert resources == [context, browser]
+    assert browser.closed is False
+
+    await cli.close_resources(resources)
+    assert browser.closed is True
+    assert resources == []
+
+
+@pytest.mark.asyncio
+async def test_scrape_cycle_leaves_delta_to_scrape_pages(monkeypatch, tmp_path):
+    resources = [DummyContext([]), None]
+    delta_path = tmp_path / "out.delta.csv"
+
+    async def fake_scrape_pages(ctx, *args, **kwargs):  # noqa: ARG001
+        assert kwargs["progress_path"] == delta_path
+        return [Listing(title="Ohne Kennung", url="https://example.com")]
+
+    monkeypatch.setattr(scraper, "scrape_pages", fake_scrape_pages)
+    args = SimpleNamespace(start_url="https://start", max_pages=1, concurrency=1, headless=True)
+
+    result = await cli.scrape_cycle(
+        None, args, tmp_path / "out.xlsx", set(), resources, delta_path=delta_path
+    )
+
+    assert result == delta_path
+    # The per-page appends in scrape_pages are the only writes.
+    assert not delta_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_run_loop_opens_detail_pool_once(monkeypatch, tmp_path, caplog):
+    playwright = DummyPlaywright(DummyBrowser(DummyContext([])))
+    args = SimpleNamespace(
+        output=tmp_path / "out.xlsx",
+        start_url="https://start",
+        max_pages=1,
+        concurrency=3,
+        headless=True,
+        user_data_dir=None,
+    )
+    opened = []
+    pools = []
+    cycles = iter([False, False, True])
+
+    async def fake_open_detail_contexts(context, size):
+        opened.append(size)
+        return [context] * size
+
+    async def fake_scrape_cycle(*_args, detail_contexts=None, **_kwargs):
+        pools.append(detail_contexts)
+
+    monkeypatch.setattr(cli, "_playwright", lambda: playwright)
+    monkeypatch.setattr(llm, "prepare_default_client", lambda: None)
+    monkeypatch.setattr(scraper, "open_detail_contexts", fake_open_detail_contexts)
+    monkeypatch.setattr(cli, "scrape_cycle", fake_scrape_cycle)
+    monkeypatch.setattr(cli, "wait_for_next_cycle", lambda stop, timeout: asyncio.sleep(0, result=next(cycles)))
+
+    with caplog.at_level("INFO", logger=cli.logger.name):
+        await cli.run_loop(args)
+
+    assert opened == [3]
+    assert len(pools) == 3
+    assert all(pool is pools[0] for pool in pools)
+    assert "Loop beendet." in caplog.messages
+
+
+@pytest.mark.asyncio
+async def test_recycle_context_keeps_storage_state():
+    class StatefulContext:
+        def __init__(self, state=None):
+            self.state = state
+            self.closed = False
+
+        async def storage_state(self):
+            return {"cookies": ["consent"]}
+
+        async def close(self):
+            self.closed = True
+
+    class StatefulBrowser:
+        async def new_context(self, storage_state=None):
+            return StatefulContext(storage_state)
+
+    old_context = StatefulContext()
+    browser = StatefulBrowser()
+    resources = [old_context, browser]
+
+    new_context = await cli.recycle_context(resources)
+
+    assert old_context.closed is True
+    assert new_context.state == {"cookies": ["consent"]}
+    assert resources == [new_context, browser]
+
+
+@pytest.mark.asyncio
+async def test_open_browser_with_persistent_profile(tmp_path):
+    context = DummyContext([])
+    launched = {}
+
+    async def launch_persistent_context(user_data_dir, headless):
+        launched.update(user_data_dir=user_data_dir, headless=headless)
+        return context
+
+    playwright = SimpleNamespace(
+        chromium=SimpleNamespace(launch_persistent_context=launch_persistent_context)
+    )
+    resources: list[object] = []
+
+    assert await cli.open_browser(
+        playwright, headless=True, resources=resources, user_data_dir=tmp_path
+    ) is context
+    assert launched == {"user_data_dir": str(tmp_path), "headless": True}
+    assert resources == [context, None]
+    assert await cli.recycle_context(resources) is context
+
+    await cli.close_resources(resources)
+    assert resources == []
+
+
+def test_cli_import_does_not_load_heavy_dependencies():
+    script = (
+        "import sys, marktview.cli; "
+        "print(any(m in sys.modules for m in ('playwright', 'openpyxl', 'requests')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_install_uvloop_without_package(monkeypatch):
+    monkeypatch.setattr(cli.sys, "platform", "linux")
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    assert cli.install_uvloop() is False
+
+    monkeypatch.setattr(cli.sys, "platform", "win32")
+    assert cli.install_uvloop() is False
+
+
+@pytest.mark.asyncio
+async def test_wait_for_next_cycle_returns_on_stop():
+    stop = asyncio.Event()
+    assert await cli.wait_for_next_cycle(stop, 0.01) is False
+
+    asyncio.get_running_loop().call_later(0.01, stop.set)
+    assert await cli.wait_for_next_cycle(stop, 60) is True
+
+
+@pytest.mark.asyncio
+async def test_wait_for_next_cycle_stops_on_sigint():
+    stop = asyncio.Event()
+    previous_handler = signal.getsignal(signal.SIGINT)
+
+    asyncio.get_running_loop().call_later(0.01, os.kill, os.getpid(), signal.SIGINT)
+    assert await cli.wait_for_next_cycle(stop, 60) is True
+    assert signal.getsignal(signal.SIGINT) is previous_handler
@@ -4,6 +4,9 @@ import openpyxl
 
 from marktview.excel_writer import (
     HEADERS,
+    append_listings_csv,
+    delta_path,
+    flush_csv_to_xlsx,
     load_existing_listing_ids,
     write_listings_to_excel,
 )
@@ -41,9 +44,87 @@ def test_write_and_load_listing_ids(tmp_path: Path):
 
     stored_ids = load_existing_listing_ids(excel_path)
     assert stored_ids == {"123", "456"}
+    assert (tmp_path / "anzeigen.ids.json").exists()
 
     # Duplicate should be skipped when writing again
     write_listings_to_excel([Listing(title="A2", url="https://a2", listing_id="123")], excel_path)
     workbook = openpyxl.load_workbook(excel_path)
     worksheet = workbook.active
     assert worksheet.max_row == 3
+
+
+def test_write_listings_keeps_existing_rows_and_wraps_body(tmp_path: Path):
+    excel_path = tmp_path / "anzeigen.xlsx"
+    write_listings_to_excel([Listing(title="A", url="https://a", body="Text A", listing_id="1")], excel_path)
+    write_listings_to_excel([Listing(title="B", url="https://b", body="Text B", listing_id="2")], excel_path)
+
+    workbook = openpyxl.load_workbook(excel_path)
+    worksheet = workbook.active
+
+    assert worksheet.title == "Anzeigen"
+    assert [worksheet["A2"].value, worksheet["A3"].value] == ["A", "B"]
+    assert worksheet["E2"].alignment.wrap_text is True
+    assert worksheet["E3"].alignment.wrap_text is True
+    assert worksheet["E3"].style == "wrap_body"
+    assert worksheet.column_dimensions["E"].width == 100
+    assert not (tmp_path / "anzeigen.xlsx.tmp").exists()
+
+
+def test_write_listings_uses_known_ids_without_rewriting(tmp_path: Path):
+    excel_path = tmp_path / "anzeigen.xlsx"
+    known_ids: set[str] = set()
+
+    write_listings_to_excel([Listing(title="A", url="https://a", listing_id="1")], excel_path, existing_ids=known_ids)
+    assert known_ids == {"1"}
+
+    modified = excel_path.stat().st_mtime_ns
+    write_listings_to_excel([Listing(title="A", url="https://a", listing_id="1")], excel_path, existing_ids=known_ids)
+    assert excel_path.stat().st_mtime_ns == modified
+
+    write_listings_to_excel([Listing(title="B", url="https://b", listing_id="2")], excel_path, existing_ids=known_ids)
+    assert known_ids == {"1", "2"}
+    assert openpyxl.load_workbook(excel_path).active.max_row == 3
+
+
+def test_append_listings_csv_and_flush(tmp_path: Path):
+    excel_path = tmp_path / "anzeigen.xlsx"
+    csv_path = delta_path(excel_path)
+    known_ids: set[str] = set()
+
+    write_listings_to_excel([Listing(title="A", url="https://a", listing_id="1")], excel_path, existing_ids=known_ids)
+    assert append_listings_csv([Listing(title="B", url="https://b", body="Zeile 1\nZeile 2", listing_id="2")], csv_path, existing_ids=known_ids) == 1
+    assert append_listings_csv([Listing(title="B", url="https://b", listing_id="2")], csv_path, existing_ids=known_ids) == 0
+    assert known_ids == {"1", "2"}
+
+    flush_csv_to_xlsx(csv_path, excel_path, existing_ids=known_ids)
+
+    assert not csv_path.exists()
+    worksheet = openpyxl.load_workbook(excel_path).active
+    assert worksheet.max_row == 3
+    assert worksheet["E3"].value == "Zeile 1\nZeile 2"
+    assert worksheet["C3"].value is None
+    assert load_existing_listing_ids(excel_path) == {"1", "2"}
+
+
+def test_listings_without_id_are_all_kept(tmp_path: Path):
+    excel_path = tmp_path / "anzeigen.xlsx"
+    csv_path = delta_path(excel_path)
+    known_ids: set[str] = set()
+
+    write_listings_to_excel(
+        [Listing(title="A", url="https://a"), Listing(title="B", url="https://b")],
+        excel_path,
+        existing_ids=known_ids,
+    )
+    assert append_listings_csv(
+        [Listing(title="C", url="https://c"), Listing(title="D", url="https://d")],
+        csv_path,
+        existing_ids=known_ids,
+    ) == 2
+    flush_csv_to_xlsx(csv_path, excel_path, existing_ids=known_ids)
+
+    worksheet = openpyxl.load_workbook(excel_path).active
+    assert [row[0] for row in worksheet.iter_rows(min_row=2, values_only=True)] == ["A", "B", "C", "D"]
+    # The "nicht angegeben" placeholder is never recorded as a known ID.
+    assert known_ids == set()
+    assert load_existing_listing_ids(excel_path) == set()
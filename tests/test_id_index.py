@@ -0,0 +1,33 @@
+import os
+from pathlib import Path
+
+from marktview import id_index
+
+
+def test_index_path_uses_sidecar_suffix(tmp_path: Path):
+    assert id_index.index_path(tmp_path / "anzeigen.xlsx") == tmp_path / "anzeigen.ids.json"
+
+
+def test_save_and_load_ids(tmp_path: Path):
+    excel_path = tmp_path / "anzeigen.xlsx"
+    excel_path.write_bytes(b"xlsx")
+
+    assert id_index.load_ids(excel_path) is None
+
+    sidecar = id_index.save_ids(excel_path, {"2", "1"})
+    assert sidecar.read_text(encoding="utf-8") == '["1", "2"]'
+    assert id_index.load_ids(excel_path) == {"1", "2"}
+
+
+def test_load_ids_ignores_stale_or_invalid_index(tmp_path: Path):
+    excel_path = tmp_path / "anzeigen.xlsx"
+    excel_path.write_bytes(b"xlsx")
+    sidecar = id_index.save_ids(excel_path, {"1"})
+
+    stat = sidecar.stat()
+    os.utime(excel_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert id_index.load_ids(excel_path) is None
+
+    sidecar.write_text('{"1": true}', encoding="utf-8")
+    os.utime(sidecar, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    assert id_index.load_ids(excel_path) is None
@@ -1,4 +1,10 @@
 import json
+import logging
+import logging.handlers
+import os
+import subprocess
+import sys
+import threading
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import MagicMock
@@ -23,6 +29,32 @@ class DummyResponse:
     def json(self):
         return self._payload
 
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode()
+
+    def iter_lines(self):
+        yield json.dumps({**self._payload, "done": True}).encode()
+
+    def close(self):
+        pass
+
+
+class StreamingResponse(DummyResponse):
+    def __init__(self, chunks):
+        super().__init__({})
+        self.chunks = chunks
+        self.read = 0
+        self.closed = False
+
+    def iter_lines(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield json.dumps(chunk).encode()
+
+    def close(self):
+        self.closed = True
+
 
 class FakeService(llm._LocalOllamaService):
     def __init__(self):
@@ -40,24 +72,48 @@ def test_build_gender_prompt_and_normalization():
     listing = Listing(title="Titel", url="https://example.com", body="Body", username="User")
     prompt = llm._build_gender_prompt(listing)
     assert "Titel" in prompt and "Body" in prompt and "User" in prompt
+    template = llm._load_prompt_templates()["gender_inference"]
+    assert prompt == template.format(listing_details=llm._format_listing_details(listing)).strip()
 
     normalized = llm._normalize_gender_output("Weiblich 80%")
-    assert normalized == "weiblich 80%"
+    assert normalized == ("weiblich 80%", 80)
 
     normalized_missing_percent = llm._normalize_gender_output("Divers")
-    assert normalized_missing_percent == "divers 50%"
+    assert normalized_missing_percent == ("divers 50%", 50)
 
     with pytest.raises(llm.LLMInferenceError):
         llm._normalize_gender_output("keine Angabe")
 
 
+def test_format_listing_details():
+    listing = Listing(
+        title="Ein  Titel",
+        url="https://example.com",
+        body="  Zeile 1\nZeile 2 ",
+        postal_code="12345",
+        listing_id="42",
+    )
+
+    assert llm._format_listing_details(listing) == (
+        "- Titel: Ein Titel\n"
+        "- Beschreibung:\n  Zeile 1\n  Zeile 2\n"
+        "- Nutzername: nicht angegeben\n"
+        "- Postleitzahl: 12345\n"
+        "- Erstellt am: nicht angegeben\n"
+        "- Listing-ID: 42\n"
+        "- URL: https://example.com"
+    )
+
+
 def test_build_target_audience_prompt_and_normalization():
     listing = Listing(title="Titel", url="https://example.com", body="Body")
     prompt = llm._build_target_audience_prompt(listing)
     assert "Zielgruppe" in prompt
 
-    assert llm._normalize_target_audience_output("Für Frauen") == "weiblich"
-    assert llm._normalize_target_audience_output("Bi und alle") == "bi"
+    assert llm._normalize_target_audience_output("Für Frauen") == ("weiblich", 100)
+    assert llm._normalize_target_audience_output("Bi und alle") == ("bi", 100)
+    assert llm._normalize_target_audience_output("Männer und Frauen") == ("weiblich", 100)
+    assert llm._normalize_target_audience_output("Trans* willkommen") == ("divers", 100)
 
     listing_with_user = Listing(title="Titel", url="https://example.com", username="User")
     prompt_user = llm._build_target_audience_prompt(listing_with_user)
@@ -72,49 +128,289 @@ def test_llm_logging_config(tmp_path: Path):
     llm.configure_llm_logging(log_dir)
     llm.configure_llm_logging(log_dir)
     assert (log_dir / "llm.log").exists()
+    assert llm.io_logger.isEnabledFor(logging.INFO)
 
 
 def test_llm_client_success(monkeypatch):
     listing = Listing(title="Titel", url="https://example.com")
     service = FakeService()
 
-    def fake_post(endpoint, json, timeout):  # noqa: A002
+    def fake_post(endpoint, json, timeout, stream=False):  # noqa: A002
         assert endpoint == llm.DEFAULT_ENDPOINT
+        assert json["stream"] is True and stream is True
         assert json["model"] == llm.DEFAULT_MODEL
+        assert json["keep_alive"] == -1
+        assert json["options"] == llm.DEFAULT_OPTIONS
         return DummyResponse({"response": "weiblich 90%"})
 
-    monkeypatch.setattr(llm.requests, "post", fake_post)
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
     client = llm.LLMClient(service=service)
     result = client.infer_gender_for_listing(listing)
     assert service.started is True
     assert result == "weiblich 90%"
 
 
-def test_llm_client_retry_and_fallback(monkeypatch):
+def test_llm_client_caches_identical_prompts(monkeypatch):
+    calls = {"count": 0}
+
+    def fake_post(endpoint, json, timeout, stream=None):  # noqa: A002
+        # Ollama streams unless told otherwise, so both flags are sent.
+        assert json["stream"] is False and stream is False
+        calls["count"] += 1
+        return DummyResponse({"response": "weiblich 90%"})
+
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
+    client = llm.LLMClient(service=FakeService())
+
+    assert client.query("prompt") == "weiblich 90%"
+    assert client.query("prompt") == "weiblich 90%"
+    assert calls["count"] == 1
+
+    client.query("prompt 2")
+    assert calls["count"] == 2
+
+    client.query("prompt", normalizer=llm._normalize_target_audience_output, enforce_confidence=False)
+    assert calls["count"] == 3
+
+    client.clear_cache()
+    client.query("prompt")
+    assert calls["count"] == 4
+
+
+def test_llm_client_streaming_stops_early(monkeypatch):
+    response = StreamingResponse(
+        [
+            {"response": "Die Zielgruppe: ", "done": False},
+            {"response": "Frauen", "done": False},
+            {"response": " und mehr", "done": False},
+        ]
+    )
+
+    def fake_post(endpoint, json, timeout, stream=False):  # noqa: A002
+        assert json["stream"] is True and stream is True
+        return response
+
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
+    client = llm.LLMClient(service=FakeService())
+
+    result = client.query(
+        "prompt",
+        normalizer=llm._normalize_target_audience_output,
+        enforce_confidence=False,
+        stream=True,
+    )
+    assert result == "weiblich"
+    # "Frauen" could still grow into a longer word until the next chunk.
+    assert response.read == 3
+    assert response.closed is True
+
+
+def test_llm_client_streaming_ignores_word_prefixes(monkeypatch):
+    response = StreamingResponse(
+        [
+            {"response": "Bi", "done": False},
+            {"response": "tte beachten: Frauen", "done": False},
+            {"response": ".", "done": False},
+            {"response": " Mehr", "done": False},
+        ]
+    )
+    monkeypatch.setattr(llm._http_session, "post", lambda *_args, **_kwargs: response)
+    client = llm.LLMClient(service=FakeService())
+
+    result = client.query(
+        "prompt",
+        normalizer=llm._normalize_target_audience_output,
+        enforce_confidence=False,
+        stream=True,
+    )
+    assert result == "weiblich"
+    assert response.read == 3
+
+
+def test_llm_client_restarts_once_on_404(monkeypatch):
+    calls = {"count": 0}
+
+    def fake_post(*_args, **_kwargs):
+        calls["count"] += 1
+        return DummyResponse({"error": "not found"}, status_code=404)
+
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
+    service = FakeService()
+    service.stop = MagicMock()
+    client = llm.LLMClient(service=service)
+
+    with pytest.raises(llm.LLMInferenceError, match="404"):
+        client.query("prompt")
+    service.stop.assert_called_once()
+    assert calls["count"] == 2
+
+
+class BrokenStreamingResponse(StreamingResponse):
+    def iter_lines(self):
+        yield json.dumps({"response": "weib", "done": False}).encode()
+        raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+
+def test_llm_client_retries_broken_stream(monkeypatch):
+    responses = [
+        BrokenStreamingResponse([]),
+        StreamingResponse([{"response": "weiblich 80%", "done": True}]),
+    ]
+    monkeypatch.setattr(llm._http_session, "post", lambda *_args, **_kwargs: responses.pop(0))
+    monkeypatch.setattr(llm, "_backoff", lambda _attempt: None)
+    client = llm.LLMClient(service=FakeService())
+
+    assert client.query("prompt", stream=True) == "weiblich 80%"
+    assert responses == []
+
+
+def test_llm_client_wraps_invalid_json(monkeypatch):
+    class InvalidResponse(DummyResponse):
+        @property
+        def content(self):
+            return b"{"
+
+    monkeypatch.setattr(
+        llm._http_session, "post", lambda *_args, **_kwargs: InvalidResponse({})
+    )
+    monkeypatch.setattr(llm, "_backoff", lambda _attempt: None)
+    client = llm.LLMClient(service=FakeService())
+
+    with pytest.raises(llm.LLMInferenceError):
+        client.query("prompt")
+
+
+def test_llm_client_streaming_keeps_audience_priority(monkeypatch):
+    response = StreamingResponse(
+        [
+            {"response": "Männer", "done": False},
+            {"response": " und", "done": False},
+            {"response": " Frauen", "done": False},
+            {"response": "", "done": True},
+        ]
+    )
+    monkeypatch.setattr(llm._http_session, "post", lambda *_args, **_kwargs: response)
+    client = llm.LLMClient(service=FakeService())
+
+    result = client.query(
+        "prompt",
+        normalizer=llm._normalize_target_audience_output,
+        enforce_confidence=False,
+        stream=True,
+    )
+    assert result == "weiblich"
+    assert response.read == 4
+
+
+def test_llm_client_gender_stream_waits_for_percentage(monkeypatch):
+    response = StreamingResponse(
+        [
+            {"response": "weiblich", "done": False},
+            {"response": " 7", "done": False},
+            {"response": "0%", "done": False},
+            {"response": " weil", "done": False},
+        ]
+    )
+    monkeypatch.setattr(llm._http_session, "post", lambda *_args, **_kwargs: response)
+    client = llm.LLMClient(service=FakeService())
+
+    assert client.query("prompt", stream=True) == "weiblich 70%"
+    assert response.read == 3
+    assert response.closed is True
+
+
+def test_llm_client_gender_stream_keeps_percentage_after_newline(monkeypatch):
+    response = StreamingResponse(
+        [
+            {"response": "weiblich\n", "done": False},
+            {"response": "Wahrscheinlichkeit 85%", "done": False},
+            {"response": "", "done": True},
+        ]
+    )
+    monkeypatch.setattr(llm._http_session, "post", lambda *_args, **_kwargs: response)
+    client = llm.LLMClient(service=FakeService())
+
+    assert client.query("prompt", stream=True) == "weiblich 85%"
+    assert response.read == 2
+
+
+def test_llm_client_unload(monkeypatch):
+    payloads = []
+
+    def fake_post(endpoint, json, timeout, stream=False):  # noqa: A002
+        payloads.append(json)
+        return DummyResponse({"response": "weiblich 90%"})
+
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
+    client = llm.LLMClient(service=FakeService())
+
+    client.unload()
+    assert payloads == []
+
+    client.query("prompt")
+    client.unload()
+    assert payloads[-1] == {"model": llm.DEFAULT_MODEL, "keep_alive": 0}
+
+
+def test_llm_client_retry_and_fallback(monkeypatch, caplog):
     listing = Listing(title="Titel", url="https://example.com")
 
     attempts = {"count": 0}
 
-    def fake_post(endpoint, json, timeout):  # noqa: A002
+    def fake_post(endpoint, json, timeout, stream=False):  # noqa: A002
         attempts["count"] += 1
         if attempts["count"] < 2:
-            raise requests.exceptions.RequestException("network down")
+            raise requests.exceptions.ReadTimeout("timed out")
         return DummyResponse({"response": "unbekannt 10%"})
 
-    monkeypatch.setattr(llm.requests, "post", fake_post)
+    delays = []
+    monkeypatch.setattr(llm.time, "sleep", delays.append)
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
     client = llm.LLMClient(service=FakeService())
-    result = client.query("prompt")
-    assert attempts["count"] == 10
+    with caplog.at_level(logging.WARNING, logger=llm.logger.name):
+        result = client.query("prompt")
+    assert attempts["count"] == 4
+    assert delays == [0.1]
     assert result == "unbekannt 50%"
+    retry_records = [r for r in caplog.records if "Versuch 1/4" in r.getMessage()]
+    assert len(retry_records) == 1 and retry_records[0].exc_info is None
+
+
+def test_llm_client_fails_fast_on_permanent_errors(monkeypatch):
+    attempts = {"count": 0}
+
+    def refused(endpoint, json, timeout, stream=False):  # noqa: A002
+        attempts["count"] += 1
+        raise requests.exceptions.ConnectionError("connection refused")
+
+    monkeypatch.setattr(llm._http_session, "post", refused)
+    service = FakeService()
+    service._mark_ready((llm.DEFAULT_MODEL, llm.DEFAULT_ENDPOINT))
+    client = llm.LLMClient(service=service)
+    with pytest.raises(llm.LLMInferenceError):
+        client.query("prompt")
+    assert attempts["count"] == 1
+    # The server is gone, so the next query has to probe it again.
+    assert service._ready_snapshot == frozenset()
+
+    def forbidden(endpoint, json, timeout, stream=False):  # noqa: A002
+        attempts["count"] += 1
+        return DummyResponse({"error": "forbidden"}, status_code=403)
+
+    monkeypatch.setattr(llm._http_session, "post", forbidden)
+    with pytest.raises(llm.LLMInferenceError):
+        client.query("prompt")
+    assert attempts["count"] == 2
 
 
 def test_llm_client_http_error(monkeypatch):
     listing = Listing(title="Titel", url="https://example.com")
 
-    def fake_post(endpoint, json, timeout):  # noqa: A002
+    def fake_post(endpoint, json, timeout, stream=False):  # noqa: A002
         return DummyResponse({"error": "missing"}, status_code=500)
 
-    monkeypatch.setattr(llm.requests, "post", fake_post)
+    monkeypatch.setattr(llm.time, "sleep", lambda _delay: None)
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
     client = llm.LLMClient(service=FakeService())
     with pytest.raises(llm.LLMInferenceError):
         client.infer_gender_for_listing(listing)
@@ -124,11 +420,13 @@ def test_llm_client_custom_endpoint(monkeypatch):
     listing = Listing(title="Titel", url="https://example.com")
     service = FakeService()
 
-    def fake_post(endpoint, json, timeout):  # noqa: A002
+    def fake_post(endpoint, json, timeout, stream=False):  # noqa: A002
         assert endpoint == "http://remote/api/generate"
+        assert json["options"]["num_predict"] == 8
+        assert json["options"]["temperature"] == llm.DEFAULT_OPTIONS["temperature"]
         return DummyResponse({"response": "männlich 99%"})
 
-    monkeypatch.setattr(llm.requests, "post", fake_post)
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
     client = llm.LLMClient(
         model="custom-model",
         endpoint="http://remote/api/generate",
@@ -140,24 +438,148 @@ def test_llm_client_custom_endpoint(monkeypatch):
     assert service.started is False
 
 
+def test_llm_client_query_batch(monkeypatch):
+    service = FakeService()
+
+    threads = set()
+
+    def fake_post(endpoint, json, timeout, stream=False):  # noqa: A002
+        threads.add(threading.current_thread().name)
+        if json["prompt"] == "kaputt":
+            return DummyResponse({"error": "missing"}, status_code=500)
+        return DummyResponse({"response": f"{json['prompt']} 80%"})
+
+    monkeypatch.setattr(llm.time, "sleep", lambda _delay: None)
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
+    client = llm.LLMClient(service=service)
+
+    results = client.query_batch(["weiblich", "kaputt", "männlich"], max_parallel=2)
+    assert results[0] == "weiblich 80%"
+    assert isinstance(results[1], llm.LLMInferenceError)
+    assert results[2] == "männlich 80%"
+    # The batch runs on the shared LLM executor instead of a pool of its own.
+    assert all(name.startswith("marktview-llm") for name in threads)
+    assert service.started is True
+    assert client.query_batch([]) == []
+
+
+def test_llm_client_infer_for_listings(monkeypatch):
+    listings = [
+        Listing(title="A", url="https://a", body="Frau"),
+        Listing(title="B", url="https://b", body="Mann"),
+    ]
+
+    def fake_post(endpoint, json, timeout, stream=False):  # noqa: A002
+        return DummyResponse({"response": "weiblich" if "Frau" in json["prompt"] else "männlich"})
+
+    monkeypatch.setattr(llm._http_session, "post", fake_post)
+    client = llm.LLMClient(service=FakeService())
+
+    assert client.infer_target_audiences_for_listings(listings) == ["weiblich", "männlich"]
+    assert client.infer_genders_for_listings(listings) == ["weiblich 50%", "männlich 50%"]
+
+
+@pytest.mark.asyncio
+async def test_ainfer_genders_keeps_order_and_isolates_failures(monkeypatch):
+    listings = [
+        Listing(title="A", url="https://a"),
+        Listing(title="B", url="https://b"),
+        Listing(title="C", url="https://c"),
+    ]
+
+    def fake_infer(listing, **_kwargs):
+        if listing.title == "B":
+            raise llm.LLMInferenceError("kaputt")
+        return f"weiblich {80 if listing.title == 'A' else 90}%"
+
+    monkeypatch.setattr(llm, "infer_gender_for_listing", fake_infer)
+
+    results = await llm.ainfer_genders(listings, max_concurrency=2)
+    assert results == [
+        (listings[0], "weiblich 80%"),
+        (listings[1], None),
+        (listings[2], "weiblich 90%"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_wrappers_use_llm_executor(monkeypatch):
+    listing = Listing(title="A", url="https://a")
+    threads = []
+
+    def fake_infer(listing_obj, **kwargs):
+        threads.append(threading.current_thread().name)
+        return kwargs.get("timeout")
+
+    monkeypatch.setattr(llm, "infer_gender_for_listing", fake_infer)
+    monkeypatch.setattr(llm, "infer_target_audience_for_listing", fake_infer)
+
+    assert await llm.ainfer_gender_for_listing(listing, timeout=5.0) == 5.0
+    assert await llm.ainfer_target_audience_for_listing(listing) is None
+    assert all(name.startswith("marktview-llm") for name in threads)
+
+
 def test_default_client_wrappers(monkeypatch):
     listing = Listing(title="Titel", url="https://example.com")
     called = {}
 
     monkeypatch.setattr(llm, "_default_client", SimpleNamespace(
         infer_gender_for_listing=lambda l: called.setdefault("gender", l.title),
+    ))
+    monkeypatch.setattr(llm, "_default_audience_client", SimpleNamespace(
+        model=llm.model_for_task("target_audience"),
         infer_target_audience_for_listing=lambda l: called.setdefault("audience", l.url),
     ))
 
     assert llm.infer_gender_for_listing(listing) == "Titel"
     assert llm.infer_target_audience_for_listing(listing) == "https://example.com"
+    assert llm.model_for_task("target_audience") != llm.DEFAULT_MODEL
+    assert llm.model_for_task("unknown") == llm.DEFAULT_MODEL
+
+
+def test_non_default_clients_are_reused(monkeypatch):
+    created = []
+
+    class RecordingClient:
+        def __init__(self, **kwargs):
+            created.append(kwargs)
+
+        def infer_gender_for_listing(self, listing):
+            return "weiblich 80%"
+
+        def infer_target_audience_for_listing(self, listing):
+            return "bi"
+
+    monkeypatch.setattr(llm, "LLMClient", RecordingClient)
+    llm._get_client.cache_clear()
+    listing = Listing(title="Titel", url="https://example.com")
+
+    try:
+        assert llm.infer_gender_for_listing(listing, model="other") == "weiblich 80%"
+        assert llm.infer_gender_for_listing(listing, model="other") == "weiblich 80%"
+        assert llm.infer_target_audience_for_listing(listing, timeout=5.0) == "bi"
+    finally:
+        llm._get_client.cache_clear()
+
+    assert created == [
+        {"model": "other", "endpoint": llm.DEFAULT_ENDPOINT, "timeout": llm.DEFAULT_TIMEOUT},
+        {"model": llm.model_for_task("target_audience"), "endpoint": llm.DEFAULT_ENDPOINT, "timeout": 5.0},
+    ]
 
 
 def test_local_service_helpers(monkeypatch):
     service = llm._LocalOllamaService()
-    monkeypatch.setattr(llm.requests, "get", lambda *_args, **_kwargs: DummyResponse({"models": []}))
+    monkeypatch.setattr(service._session, "post", lambda *_args, **_kwargs: DummyResponse({"error": "not found"}, status_code=404))
+    monkeypatch.setattr(service._session, "head", lambda *_args, **_kwargs: DummyResponse({}, status_code=405))
+    assert service._is_reachable("http://localhost:11434") is True
     assert service._base_url("http://localhost:11434/api/generate") == "http://localhost:11434"
-    assert service._model_exists("http://localhost:11434", "gemma3:4b") is False
+    assert service._probe("http://localhost:11434", "gemma3:4b") == (True, False)
+
+    def refused(*_args, **_kwargs):
+        raise llm.requests.exceptions.ConnectionError("refused")
+
+    monkeypatch.setattr(service._session, "post", refused)
+    assert service._probe("http://localhost:11434", "gemma3:4b") == (False, False)
 
     called = {}
 
@@ -165,7 +587,157 @@ def test_local_service_helpers(monkeypatch):
         called["cmd"] = cmd
         return SimpleNamespace(returncode=0)
 
+    # Servers without /api/pull are served by the CLI.
+    monkeypatch.setattr(service._session, "post", lambda *_args, **_kwargs: DummyResponse({}, status_code=404))
     monkeypatch.setattr(llm.subprocess, "run", fake_run)
-    monkeypatch.setattr(service, "_wait_until_ready", lambda *_: None)
-    service._pull_model("ollama", "gemma3:4b")
-    assert called["cmd"][1:] == ["pull", "gemma3:4b"]
+    service._binary = "ollama"
+    service._pull_model("http://localhost:11434", "gemma3:4b")
+    assert called["cmd"] == ["ollama", "pull", "gemma3:4b"]
+
+
+def test_pull_model_uses_http_api(monkeypatch):
+    service = llm._LocalOllamaService()
+    requests_seen = []
+    response = StreamingResponse(
+        [{"status": "pulling manifest"}, {"status": "downloading", "completed": 10}, {"status": "success"}]
+    )
+
+    def fake_post(url, json, timeout, stream=False):  # noqa: A002
+        requests_seen.append((url, json, stream))
+        return response
+
+    monkeypatch.setattr(service._session, "post", fake_post)
+    monkeypatch.setattr(llm.subprocess, "run", MagicMock(side_effect=AssertionError("CLI used")))
+
+    service._pull_model("http://localhost:11434", "m")
+    assert requests_seen == [("http://localhost:11434/api/pull", {"model": "m", "stream": True}, True)]
+    assert response.closed is True
+
+    failing = StreamingResponse([{"status": "pulling manifest"}, {"error": "file does not exist"}])
+    monkeypatch.setattr(service._session, "post", lambda *_args, **_kwargs: failing)
+    with pytest.raises(llm.LLMInferenceError, match="file does not exist"):
+        service._pull_model("http://localhost:11434", "m")
+
+
+def test_ensure_running_caches_ready_model(monkeypatch):
+    service = llm._LocalOllamaService()
+    calls = {"which": 0, "tags": 0}
+
+    def fake_which(name):
+        calls["which"] += 1
+        return "/usr/bin/ollama"
+
+    def fake_probe(base_url, model):
+        calls["tags"] += 1
+        return True, True
+
+    warmed = threading.Semaphore(0)
+
+    def fake_warm_up(base_url, model):
+        calls["warm"] = calls.get("warm", 0) + 1
+        warmed.release()
+
+    monkeypatch.setattr(llm.shutil, "which", fake_which)
+    monkeypatch.setattr(service, "_probe", fake_probe)
+    monkeypatch.setattr(service, "_warm_up", fake_warm_up)
+
+    service.ensure_running(model="m", endpoint=llm.DEFAULT_ENDPOINT)
+    service.ensure_running(model="m", endpoint=llm.DEFAULT_ENDPOINT)
+    assert warmed.acquire(timeout=5)
+    # The binary is only looked up when a server or model has to be provided.
+    assert calls == {"which": 0, "tags": 1, "warm": 1}
+
+    service.stop()
+    service.ensure_running(model="m", endpoint=llm.DEFAULT_ENDPOINT)
+    assert warmed.acquire(timeout=5)
+    assert calls == {"which": 0, "tags": 2, "warm": 2}
+
+
+def test_ensure_running_pulls_in_background(monkeypatch):
+    service = llm._LocalOllamaService()
+    release = threading.Event()
+    pulled = []
+
+    def fake_pull(base_url, model):
+        release.wait(5)
+        pulled.append(model)
+
+    monkeypatch.setattr(llm.shutil, "which", lambda name: "/usr/bin/ollama")
+    monkeypatch.setattr(service, "_probe", lambda _url, _model: (True, False))
+    monkeypatch.setattr(service, "_wait_until_ready", lambda _url: None)
+    monkeypatch.setattr(service, "_warm_up", lambda _url, _model: None)
+    monkeypatch.setattr(service, "_pull_model", fake_pull)
+
+    service.ensure_running(model="m", endpoint=llm.DEFAULT_ENDPOINT, wait=False)
+    assert pulled == []
+
+    release.set()
+    service.ensure_running(model="m", endpoint=llm.DEFAULT_ENDPOINT)
+    assert pulled == ["m"]
+    assert ("m", llm.DEFAULT_ENDPOINT) in service._ready_snapshot
+
+    def failing_pull(base_url, model):
+        raise llm.LLMInferenceError("pull failed")
+
+    monkeypatch.setattr(service, "_pull_model", failing_pull)
+    with pytest.raises(llm.LLMInferenceError, match="pull failed"):
+        service.ensure_running(model="other", endpoint=llm.DEFAULT_ENDPOINT)
+
+
+def test_suggested_thread_count_uses_affinity(monkeypatch):
+    service = llm._LocalOllamaService()
+    monkeypatch.setattr(llm.os, "sched_getaffinity", lambda _pid: {0, 1, 2}, raising=False)
+    assert service._suggested_thread_count() == 2
+
+    monkeypatch.delattr(llm.os, "sched_getaffinity")
+    monkeypatch.setattr(llm.os, "cpu_count", lambda: None)
+    assert service._suggested_thread_count() == 1
+
+
+def test_wait_until_ready_backs_off(monkeypatch):
+    service = llm._LocalOllamaService()
+    checks = iter([False] * 7 + [True])
+    delays = []
+
+    monkeypatch.setattr(service, "_is_reachable", lambda _url: next(checks))
+    monkeypatch.setattr(llm.time, "sleep", delays.append)
+    service._wait_until_ready("http://localhost:11434")
+
+    assert delays == pytest.approx([0.025, 0.0375, 0.05625, 0.084375, 0.1265625, 0.18984375, 0.25])
+
+
+def test_configure_llm_logging_buffers_and_is_idempotent(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm, "_configured_log_paths", set())
+    handlers_before = list(llm.io_logger.handlers)
+    level_before = llm.io_logger.level
+    try:
+        llm.configure_llm_logging(tmp_path)
+        llm.configure_llm_logging(tmp_path)
+        added = [h for h in llm.io_logger.handlers if h not in handlers_before]
+        assert len(added) == 1
+        assert isinstance(added[0], logging.handlers.MemoryHandler)
+
+        llm.io_logger.info("prompt")
+        assert (tmp_path / "llm.log").read_text(encoding="utf-8") == ""
+        added[0].flush()
+        assert "prompt" in (tmp_path / "llm.log").read_text(encoding="utf-8")
+    finally:
+        for handler in llm.io_logger.handlers[:]:
+            if handler not in handlers_before:
+                llm.io_logger.removeHandler(handler)
+                target = handler.target
+                handler.close()
+                target.close()
+        llm.io_logger.setLevel(level_before)
+
+
+def test_model_override_applies_to_every_task():
+    script = "from marktview import llm; print(sorted(set(llm.MODEL_ALIASES.values())))"
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "MARKTVIEW_LLM_MODEL": "gemma3:4b"},
+        check=True,
+    )
+    assert result.stdout.strip() == "['gemma3:4b']"
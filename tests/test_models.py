@@ -1,4 +1,4 @@
-from marktview.models import Listing
+from marktview.models import NOT_SPECIFIED, Listing
 
 
 def test_listing_strips_fields():
@@ -25,3 +25,11 @@ def test_listing_strips_fields():
     assert listing.financial_interest == "nein"
     assert listing.listing_id == "ID-1"
     assert listing.username == "user"
+
+
+def test_listing_uses_slots_and_shared_placeholder():
+    listing = Listing(title="Title", url="https://example.com")
+
+    assert not hasattr(listing, "__dict__")
+    assert listing.username is NOT_SPECIFIED
+    assert listing.listing_id is NOT_SPECIFIED
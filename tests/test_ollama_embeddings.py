@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from marktview import ollama_embeddings as oe
@@ -5,8 +7,9 @@ from marktview.models import Listing
 
 
 class DummyResponse:
-    def __init__(self, payload):
+    def __init__(self, payload, status_code=200):
         self._payload = payload
+        self.status_code = status_code
 
     def raise_for_status(self):
         return None
@@ -14,6 +17,12 @@ class DummyResponse:
     def json(self):
         return self._payload
 
+    @property
+    def content(self):
+        if isinstance(self._payload, bytes):
+            return self._payload
+        return json.dumps(self._payload).encode()
+
 
 def test_build_prompt_truncates_and_collects_metadata():
     listing = Listing(
@@ -28,6 +37,9 @@ def test_build_prompt_truncates_and_collects_metadata():
     assert prompt.endswith("…")
     assert len(prompt) <= 20
 
+    body_only = Listing(title="", url="https://example.com", body="x" * 5000, username="")
+    assert oe.build_prompt(body_only, max_chars=20) == "x" * 19 + "…"
+
 
 def test_embed_text_and_listing(monkeypatch):
     calls = {}
@@ -38,7 +50,7 @@ def test_embed_text_and_listing(monkeypatch):
         calls["timeout"] = timeout
         return DummyResponse({"embedding": [0.1, 0.2]})
 
-    monkeypatch.setattr(oe.requests, "post", fake_post)
+    monkeypatch.setattr(oe._session, "post", fake_post)
     vector = oe.embed_text("hello", model="m", endpoint="http://e", timeout=1.0)
     assert vector == [0.1, 0.2]
     assert calls == {"endpoint": "http://e", "json": {"model": "m", "prompt": "hello"}, "timeout": 1.0}
@@ -47,8 +59,76 @@ def test_embed_text_and_listing(monkeypatch):
     vector_listing = oe.embed_listing(listing, model="m", endpoint="http://e")
     assert vector_listing == [0.1, 0.2]
 
-    embedded = oe.embed_listings([listing], model="m", endpoint="http://e")
-    assert embedded == [(listing, [0.1, 0.2])]
+
+
+def test_embed_texts_batches_inputs(monkeypatch):
+    calls = []
+
+    def fake_post(endpoint, json, timeout):  # noqa: A002
+        calls.append((endpoint, json["input"]))
+        return DummyResponse({"embeddings": [[float(len(text))] for text in json["input"]]})
+
+    monkeypatch.setattr(oe._session, "post", fake_post)
+    vectors = oe.embed_texts(["a", "bb", "ccc"], model="m", batch_size=2)
+
+    assert vectors == [[1.0], [2.0], [3.0]]
+    assert calls == [
+        (oe.DEFAULT_BATCH_ENDPOINT, ["a", "bb"]),
+        (oe.DEFAULT_BATCH_ENDPOINT, ["ccc"]),
+    ]
+
+
+def test_embed_texts_falls_back_to_single_prompt_endpoint(monkeypatch):
+    endpoint = "http://old:11434/api/embed"
+    calls = []
+
+    def fake_post(url, json, timeout):  # noqa: A002
+        calls.append(url)
+        if url == endpoint:
+            return DummyResponse(b"404 page not found", status_code=404)
+        return DummyResponse({"embedding": [float(len(json["prompt"]))]})
+
+    monkeypatch.setattr(oe._session, "post", fake_post)
+    monkeypatch.setattr(oe, "_unsupported_batch_endpoints", set())
+
+    assert oe.embed_texts(["a", "bb"], endpoint=endpoint) == [[1.0], [2.0]]
+    assert oe.embed_texts(["ccc"], endpoint=endpoint) == [[3.0]]
+    assert calls == [endpoint] + ["http://old:11434/api/embeddings"] * 3
+
+
+def test_embed_texts_reports_missing_model_without_disabling_batches(monkeypatch):
+    endpoint = "http://new:11434/api/embed"
+    calls = []
+
+    def fake_post(url, json, timeout):  # noqa: A002
+        calls.append((url, json["model"]))
+        if json["model"] == "missing":
+            return DummyResponse({"error": 'model "missing" not found'}, status_code=404)
+        return DummyResponse({"embeddings": [[1.0]] * len(json["input"])})
+
+    monkeypatch.setattr(oe._session, "post", fake_post)
+    monkeypatch.setattr(oe, "_unsupported_batch_endpoints", set())
+
+    with pytest.raises(oe.OllamaEmbeddingError, match="not found"):
+        oe.embed_texts(["a"], model="missing", endpoint=endpoint)
+    assert oe.embed_texts(["a", "b"], model="m", endpoint=endpoint) == [[1.0], [1.0]]
+    assert calls == [(endpoint, "missing"), (endpoint, "m")]
+    assert oe._unsupported_batch_endpoints == set()
+
+
+def test_embed_texts_accepts_single_prompt_endpoint(monkeypatch):
+    endpoint = "http://old:11434/api/embeddings"
+    payloads = []
+
+    def fake_post(url, json, timeout):  # noqa: A002
+        assert url == endpoint
+        payloads.append(json)
+        return DummyResponse({"embedding": [float(len(json["prompt"]))]})
+
+    monkeypatch.setattr(oe._session, "post", fake_post)
+
+    assert oe.embed_texts(["a", "bb"], endpoint=endpoint) == [[1.0], [2.0]]
+    assert all("input" not in payload for payload in payloads)
 
 
 def test_embed_listing_without_prompt(monkeypatch):
@@ -59,6 +139,38 @@ def test_embed_listing_without_prompt(monkeypatch):
 
 
 def test_embed_text_raises_for_missing_embedding(monkeypatch):
-    monkeypatch.setattr(oe.requests, "post", lambda *_args, **_kwargs: DummyResponse({}))
+    monkeypatch.setattr(oe._session, "post", lambda *_args, **_kwargs: DummyResponse({}))
     with pytest.raises(oe.OllamaEmbeddingError):
         oe.embed_text("text")
+
+
+def test_embed_listings_runs_batches_concurrently_and_keeps_order(monkeypatch):
+    import threading
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_post(endpoint, json, timeout):  # noqa: A002
+        barrier.wait()
+        return DummyResponse(
+            {"embeddings": [[1.0 if text.startswith("A") else 2.0] for text in json["input"]]}
+        )
+
+    monkeypatch.setattr(oe._session, "post", fake_post)
+    listings = [
+        Listing(title="A", url="https://a"),
+        Listing(title="B", url="https://b"),
+    ]
+
+    embedded = oe.embed_listings(listings, concurrency=2, batch_size=1)
+    assert embedded == [(listings[0], [1.0]), (listings[1], [2.0])]
+
+
+def test_embedding_array_normalises_for_cosine_similarity():
+    left = oe.embedding_array([3.0, 4.0])
+    right = oe.embedding_array([4.0, 3.0])
+
+    assert left.typecode == "f"
+    assert list(left) == pytest.approx([0.6, 0.8])
+    assert oe.cosine_similarity(left, left) == pytest.approx(1.0)
+    assert oe.cosine_similarity(left, right) == pytest.approx(0.96)
+    assert list(oe.embedding_array([0.0, 0.0])) == [0.0, 0.0]
@@ -2,6 +2,8 @@ import asyncio
 from unittest.mock import AsyncMock
 
 import pytest
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from marktview import page_actions
 
@@ -11,7 +13,7 @@ class FakeButton:
         self.visible = visible
         self.clicked = False
 
-    async def is_visible(self, timeout=None):  # noqa: ARG002
+    async def is_visible(self):
         return self.visible
 
     async def click(self):
@@ -34,6 +36,7 @@ class FakePage:
         self.cookie_buttons = cookie_buttons or []
         self.age_button = age_button
         self.waits = []
+        self.busy_states = ()
 
     def get_by_role(self, *_, **__):
         return FakeButtonLocator(self.cookie_buttons)
@@ -41,52 +44,98 @@ class FakePage:
     def locator(self, *_):
         return self.age_button
 
-    async def wait_for_load_state(self, state):  # noqa: ARG002
+    async def wait_for_load_state(self, state, timeout=None):  # noqa: ARG002
         self.waits.append(state)
+        if state in self.busy_states:
+            raise PlaywrightTimeoutError(state)
 
 
 @pytest.mark.asyncio
-async def test_accept_cookies_clicks_first_visible():
-    first = FakeButton(visible=True)
-    page = FakePage(cookie_buttons=[first, FakeButton(visible=True)])
+@pytest.mark.parametrize("first_visible", [True, False])
+async def test_accept_cookies_clicks_first_visible(first_visible):
+    first = FakeButton(visible=first_visible)
+    second = FakeButton(visible=True)
+    page = FakePage(cookie_buttons=[first, second])
 
     await page_actions.accept_cookies(page)
-    assert first.clicked is True
+    assert (first.clicked, second.clicked) == (first_visible, not first_visible)
+
+
+@pytest.mark.asyncio
+async def test_accept_cookies_probes_buttons_together():
+    started = []
+    release = asyncio.Event()
+
+    class SlowButton(FakeButton):
+        async def is_visible(self):
+            started.append(self)
+            if len(started) == 3:
+                release.set()
+            # Only returns once every probe has started.
+            await release.wait()
+            if not self.visible:
+                raise PlaywrightError("detached")
+            return True
+
+    buttons = [SlowButton(visible=False), SlowButton(visible=True), SlowButton(visible=True)]
+    await page_actions.accept_cookies(FakePage(cookie_buttons=buttons))
+    assert [button.clicked for button in buttons] == [False, True, False]
 
 
 @pytest.mark.asyncio
 async def test_accept_cookies_handles_exception():
     class ErrPage:
         def get_by_role(self, *_, **__):  # noqa: ANN001
-            raise RuntimeError("fail")
+            raise PlaywrightError("fail")
 
     await page_actions.accept_cookies(ErrPage())
 
 
 @pytest.mark.asyncio
-async def test_confirm_age_handles_absent_button():
-    page = FakePage(age_button=FakeButton(visible=False))
-    await page_actions.confirm_age(page)
-    assert page.age_button.clicked is False
-
-
-@pytest.mark.asyncio
-async def test_confirm_age_clicks_when_visible():
-    button = FakeButton(visible=True)
+@pytest.mark.parametrize("visible", [True, False])
+async def test_confirm_age_clicks_only_visible_button(visible):
+    button = FakeButton(visible=visible)
     page = FakePage(age_button=button)
     await page_actions.confirm_age(page)
-    assert button.clicked is True
+    assert button.clicked is visible
 
 
 @pytest.mark.asyncio
 async def test_confirm_age_handles_exception():
     class ErrPage:
         def locator(self, *_):  # noqa: ANN001
-            raise RuntimeError("broken")
+            raise PlaywrightError("broken")
 
     await page_actions.confirm_age(ErrPage())
 
 
+@pytest.mark.asyncio
+async def test_handle_intro_dialogs_handles_both_dialogs():
+    cookie_button = FakeButton(visible=True)
+    age_button = FakeButton(visible=True)
+    page = FakePage(cookie_buttons=[cookie_button], age_button=age_button)
+
+    await page_actions.handle_intro_dialogs(page)
+    assert cookie_button.clicked is True
+    assert age_button.clicked is True
+
+
+@pytest.mark.asyncio
+async def test_handle_intro_dialogs_reports_unexpected_errors(capsys):
+    age_button = FakeButton(visible=True)
+
+    async def broken():
+        raise ValueError("kaputt")
+
+    age_button.is_visible = broken
+    cookie_button = FakeButton(visible=True)
+    page = FakePage(cookie_buttons=[cookie_button], age_button=age_button)
+
+    await page_actions.handle_intro_dialogs(page)
+    assert cookie_button.clicked is True
+    assert "Altersverifikation unerwarteter Fehler: ValueError('kaputt')" in capsys.readouterr().out
+
+
 @pytest.mark.asyncio
 async def test_wait_for_page_ready_uses_jitter(monkeypatch):
     sleep_called = False
@@ -103,3 +152,13 @@ async def test_wait_for_page_ready_uses_jitter(monkeypatch):
     await page_actions.wait_for_page_ready(page, delay=0.5)
     assert "networkidle" in page.waits
     assert sleep_called
+
+
+@pytest.mark.asyncio
+async def test_wait_for_page_ready_falls_back_when_network_stays_busy(monkeypatch):
+    monkeypatch.setattr(page_actions.asyncio, "sleep", AsyncMock())
+
+    page = FakePage()
+    page.busy_states = ("networkidle",)
+    await page_actions.wait_for_page_ready(page, delay=0)
+    assert page.waits == ["networkidle", "domcontentloaded"]
@@ -2,6 +2,7 @@ import asyncio
 from types import SimpleNamespace
 
 import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from marktview import parsers
 from marktview.models import Listing
@@ -11,55 +12,40 @@ class FakeElement:
     def __init__(self, title=None, url=None):
         self.attrs = {"title": title, "data-onclick-url": url}
 
-    async def get_attribute(self, name):
-        return self.attrs.get(name)
-
 
 class FakeListingLocator:
     def __init__(self, elements):
         self._elements = elements
 
-    async def count(self):
-        return len(self._elements)
-
-    def nth(self, index):
-        return self._elements[index]
-
-
-class FakeDetailLocator:
-    def __init__(self, text=None, raise_error=False):
-        self.text = text
-        self.raise_error = raise_error
-
-    async def inner_text(self):
-        if self.raise_error:
-            raise RuntimeError("locator error")
-        return self.text
-
-    async def all_inner_texts(self):
-        if not self.text:
-            return []
-        return self.text.split("\n")
+    async def evaluate_all(self, _script):
+        return [
+            [element.attrs["title"] or "", element.attrs["data-onclick-url"] or ""]
+            for element in self._elements
+        ]
 
 
 class FakePage:
     def __init__(self, mapping=None):
         self.mapping = mapping or {}
         self.visits = []
+        self.scripts = []
 
     def locator(self, selector):
-        if selector == "li.clsy-c-result-list-item":
-            return FakeListingLocator(self.mapping.get("listings", []))
-        return self.mapping.get(selector, FakeDetailLocator())
+        assert selector == "li.clsy-c-result-list-item"
+        return FakeListingLocator(self.mapping.get("listings", []))
 
-    async def goto(self, url):
+    async def goto(self, url, wait_until=None):  # noqa: ARG002
         self.visits.append(url)
 
-    async def wait_for_load_state(self, _):
-        pass
+    async def wait_for_selector(self, selector, timeout=None):  # noqa: ARG002
+        if "ready" not in self.mapping:
+            raise PlaywrightTimeoutError(selector)
 
-    async def wait_for_timeout(self, _):
-        pass
+    async def evaluate(self, script):
+        self.scripts.append(script)
+        details = {"location": None, "date": None, "body": None, "username": None, "attributes": []}
+        details.update(self.mapping.get("details", {}))
+        return details
 
 
 @pytest.mark.asyncio
@@ -75,21 +61,38 @@ async def test_parse_listings_filters_and_builds_full_url():
     assert listings[0].url.startswith("https://erotik.markt.de")
 
 
+@pytest.mark.asyncio
+async def test_parse_listings_handles_a_large_result_page():
+    elements = [
+        FakeElement(title=f"Ad {index}", url=f"/anzeige/{index}")
+        if index % 4
+        else FakeElement(title="Werbung", url=f"https://FEED.SOLADS.MEDIA/{index}")
+        for index in range(1000)
+    ]
+
+    listings = await parsers.parse_listings(FakePage({"listings": elements}))
+    assert len(listings) == 750
+    assert listings[0].url == "https://erotik.markt.de/anzeige/1"
+    assert all(listing.title.startswith("Ad ") for listing in listings)
+
+
 @pytest.mark.asyncio
 async def test_parse_listing_details_populates_fields():
     listing = Listing(title="Ad", url="https://erotik.markt.de/listing")
     page = FakePage(
         {
-            "div.clsy-c-expose-details__location": FakeDetailLocator("PLZ 12345 Berlin"),
-            "div.clsy-c-expose-details__date": FakeDetailLocator("Heute"),
-            "div#clsy-c-expose-body": FakeDetailLocator("Body"),
-            "div.clsy-c-userbox__profile-name": FakeDetailLocator("User"),
-            "span.clsy-attribute-list__label": FakeDetailLocator(
-                "Geschlecht\nInteresse an Geld\nAnzeigenkennung"
-            ),
-            "span.clsy-attribute-list__description": FakeDetailLocator(
-                "männlich\nJa\nABC123"
-            ),
+            "ready": True,
+            "details": {
+                "location": "PLZ 12345 Berlin",
+                "date": "Heute",
+                "body": " Body\n",
+                "username": "User",
+                "attributes": [
+                    ["Geschlecht", "männlich"],
+                    ["Inte\u00ADresse an Geld", "Ja"],
+                    ["Anzeigenkennung", " ABC123 "],
+                ],
+            }
         }
     )
 
@@ -101,9 +104,17 @@ async def test_parse_listing_details_populates_fields():
     assert listing.gender == "männlich"
     assert listing.financial_interest == "Ja"
     assert listing.listing_id == "ABC123"
+    # All fields arrive with a single round trip to the browser.
+    assert page.scripts == [parsers._DETAILS_JS]
 
 
 @pytest.mark.asyncio
-async def test_safe_inner_text_handles_errors():
-    page = FakePage({"div.error": FakeDetailLocator(raise_error=True)})
-    assert await parsers._safe_inner_text(page, "div.error") is None
+async def test_parse_listing_details_keeps_defaults_for_missing_fields():
+    listing = Listing(title="Ad", url="https://erotik.markt.de/listing")
+
+    await parsers.parse_listing_details(FakePage(), listing)
+    assert listing.postal_code == ""
+    assert listing.created_at is None
+    assert listing.body is None
+    assert listing.username == "nicht angegeben"
+    assert listing.listing_id == "nicht angegeben"
@@ -1,12 +1,18 @@
 import asyncio
-from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
+from playwright.async_api import Error as PlaywrightError
 
-from marktview import scraper
+from marktview import llm, scraper
+from marktview.excel_writer import write_listings_to_excel
 from marktview.models import Listing
 
 
+async def _noop(*args, **kwargs):  # noqa: ARG001
+    return None
+
+
 class DummyPage:
     def __init__(self, listings, next_visible=True):
         self.listings = listings
@@ -19,22 +25,22 @@ class DummyPage:
     async def goto(self, url):
         self.visited.append(url)
 
-    async def wait_for_load_state(self, state):  # noqa: ARG002
+    async def wait_for_load_state(self, state, timeout=None):  # noqa: ARG002
         return None
 
     async def wait_for_timeout(self, timeout):  # noqa: ARG002
         return None
 
     def locator(self, selector):
-        if selector == "button.clsy-c-pagination__next":
-            return self
-        return None
+        return {"button.clsy-c-pagination__next": self}.get(selector)
 
-    async def is_visible(self, timeout=None):  # noqa: ARG002
-        self.clicks += 0
+    async def count(self):
+        return 1
+
+    async def is_visible(self):
         return self.next_visible
 
-    async def click(self):
+    async def click(self, no_wait_after=False):  # noqa: ARG002
         self.clicks += 1
 
     async def content(self):
@@ -43,11 +49,16 @@ class DummyPage:
     async def close(self):
         self.closed = True
 
+    def is_closed(self):
+        return self.closed
+
 
 class DummyContext:
-    def __init__(self, pages):
+    def __init__(self, pages, browser=None):
         self.pages = pages
+        self.browser = browser
         self.created = []
+        self.routes = []
 
     async def new_page(self):
         if not self.pages:
@@ -57,12 +68,14 @@ class DummyContext:
         self.created.append(page)
         return page
 
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
 
 @pytest.mark.asyncio
 async def test_populate_listing_infers_fields(monkeypatch):
     listing = Listing(title="Ad", url="https://example.com")
     detail_page = DummyPage([], next_visible=False)
-    context = DummyContext([detail_page])
 
     async def fake_parse_detail(page, listing_obj):
         listing_obj.gender = "nicht angegeben"
@@ -70,25 +83,136 @@ async def test_populate_listing_infers_fields(monkeypatch):
         listing_obj.username = "user"
 
     monkeypatch.setattr(scraper, "parse_listing_details", fake_parse_detail)
-    monkeypatch.setattr(scraper, "infer_gender_for_listing", lambda l: "weiblich 90%")
-    monkeypatch.setattr(scraper, "infer_target_audience_for_listing", lambda l: "männlich")
+    monkeypatch.setattr(llm, "infer_gender_for_listing", lambda l: "weiblich 90%")
+    monkeypatch.setattr(llm, "infer_target_audience_for_listing", lambda l: "männlich")
 
-    await scraper._populate_listing(context, listing, asyncio.Semaphore(1), set())
+    await scraper._populate_listing(detail_page, listing, set())
     assert listing.gender.startswith("weiblich")
     assert listing.target_audience == "männlich"
     assert listing.listing_id == "abc"
-    assert detail_page.closed is True
+    # Detail pages belong to the pool and stay open for the next listing.
+    assert detail_page.closed is False
+
+
+@pytest.mark.asyncio
+async def test_populate_listing_skips_llm_for_known_id(monkeypatch):
+    detail_page = DummyPage([], next_visible=False)
+    calls = []
+
+    async def fake_parse_detail(page, listing_obj):  # noqa: ARG001
+        if listing_obj.title != "ohne Kennung":
+            listing_obj.listing_id = "abc"
+
+    monkeypatch.setattr(scraper, "parse_listing_details", fake_parse_detail)
+    monkeypatch.setattr(llm, "infer_gender_for_listing", lambda l: calls.append(l.title))
+    monkeypatch.setattr(llm, "infer_target_audience_for_listing", lambda l: calls.append(l.title))
+
+    known = {"abc"}
+    duplicate = Listing(title="Dublette", url="https://example.com/x")
+    assert await scraper._populate_listing(detail_page, duplicate, known) is False
+    assert calls == []
+
+    # Listings without an ID on their detail page are never treated as known.
+    for _ in range(2):
+        listing = Listing(title="ohne Kennung", url="https://example.com/y")
+        assert await scraper._populate_listing(detail_page, listing, known) is True
+    assert known == {"abc"}
+
+
+@pytest.mark.asyncio
+async def test_populate_listing_skips_listing_on_parse_error(monkeypatch):
+    listing = Listing(title="Ad", url="https://example.com")
+
+    async def broken_parse(page, listing_obj):  # noqa: ARG001
+        raise KeyError("location")
+
+    monkeypatch.setattr(scraper, "parse_listing_details", broken_parse)
+
+    assert await scraper._populate_listing(DummyPage([]), listing, set()) is True
 
 
 @pytest.mark.asyncio
-async def test_scrape_pages_handles_duplicates_and_progress(monkeypatch, tmp_path):
+async def test_populate_listing_runs_inferences_independently(monkeypatch):
+    listing = Listing(title="Ad", url="https://example.com")
+    detail_page = DummyPage([], next_visible=False)
+    started = []
+
+    async def fake_parse_detail(page, listing_obj):  # noqa: ARG001
+        return None
+
+    def failing_gender(listing_obj):  # noqa: ARG001
+        started.append("gender")
+        raise RuntimeError("LLM down")
+
+    def audience(listing_obj):  # noqa: ARG001
+        started.append("audience")
+        return "weiblich"
+
+    monkeypatch.setattr(scraper, "parse_listing_details", fake_parse_detail)
+    monkeypatch.setattr(llm, "infer_gender_for_listing", failing_gender)
+    monkeypatch.setattr(llm, "infer_target_audience_for_listing", audience)
+
+    await scraper._populate_listing(detail_page, listing, set())
+    assert sorted(started) == ["audience", "gender"]
+    assert listing.gender == "unbekannt 50%"
+    assert listing.target_audience == "weiblich"
+
+
+@pytest.mark.asyncio
+async def test_populate_from_pool_reuses_and_replaces_pages(monkeypatch):
+    replacement = DummyPage([], next_visible=False)
+    page = DummyPage([], next_visible=False)
+    page.context = DummyContext([replacement])
+    seen = []
+
+    async def fake_populate(detail_page, listing, known_listing_ids):  # noqa: ARG001
+        seen.append(detail_page)
+        if listing.title == "crash":
+            await detail_page.close()
+
+    monkeypatch.setattr(scraper, "_populate_listing", fake_populate)
+    pool = scraper._page_pool([page])
+
+    await scraper._populate_from_pool(pool, Listing(title="Ad", url="u"), set())
+    await scraper._populate_from_pool(pool, Listing(title="crash", url="u"), set())
+    await scraper._populate_from_pool(pool, Listing(title="Ad", url="u"), set())
+
+    assert seen == [page, page, replacement]
+    assert pool.get_nowait() is replacement
+
+
+@pytest.mark.asyncio
+async def test_populate_from_pool_keeps_original_error_when_replacement_fails(monkeypatch):
+    page = DummyPage([], next_visible=False)
+
+    class DeadContext:
+        async def new_page(self):
+            raise PlaywrightError("context closed")
+
+    page.context = DeadContext()
+
+    async def crashing_populate(detail_page, listing, known_listing_ids):  # noqa: ARG001
+        await detail_page.close()
+        raise RuntimeError("original")
+
+    monkeypatch.setattr(scraper, "_populate_listing", crashing_populate)
+    pool = scraper._page_pool([page])
+
+    with pytest.raises(RuntimeError, match="original"):
+        await scraper._populate_from_pool(pool, Listing(title="Ad", url="u"), set())
+    # The pool does not shrink, so later fetches cannot wait forever.
+    assert pool.get_nowait() is page
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("suffix", [".xlsx", ".csv"])
+async def test_scrape_pages_handles_duplicates_and_progress(monkeypatch, tmp_path, suffix):
     listings_page = [Listing(title="Ad1", url="https://example.com/1", listing_id="1")]
     main_page = DummyPage(listings_page, next_visible=False)
-    context = DummyContext([main_page])
+    context = DummyContext([main_page], browser=object())
 
-    monkeypatch.setattr(scraper, "wait_for_page_ready", lambda page, delay=0: asyncio.sleep(0))
-    monkeypatch.setattr(scraper, "accept_cookies", lambda page: asyncio.sleep(0))
-    monkeypatch.setattr(scraper, "confirm_age", lambda page: asyncio.sleep(0))
+    monkeypatch.setattr(scraper, "wait_for_page_ready", _noop)
+    monkeypatch.setattr(scraper, "handle_intro_dialogs", _noop)
 
     async def fake_parse_listings(page):
         return listings_page
@@ -98,10 +222,10 @@ async def test_scrape_pages_handles_duplicates_and_progress(monkeypatch, tmp_pat
 
     monkeypatch.setattr(scraper, "parse_listings", fake_parse_listings)
     monkeypatch.setattr(scraper, "parse_listing_details", fake_parse_details)
-    monkeypatch.setattr(scraper, "infer_gender_for_listing", lambda listing: "weiblich 90%")
-    monkeypatch.setattr(scraper, "infer_target_audience_for_listing", lambda listing: "weiblich")
+    monkeypatch.setattr(llm, "infer_gender_for_listing", lambda listing: "weiblich 90%")
+    monkeypatch.setattr(llm, "infer_target_audience_for_listing", lambda listing: "weiblich")
 
-    progress_path = tmp_path / "progress.xlsx"
+    progress_path = tmp_path / f"progress{suffix}"
     results = await scraper.scrape_pages(
         context,
         "https://start",
@@ -113,7 +237,163 @@ async def test_scrape_pages_handles_duplicates_and_progress(monkeypatch, tmp_pat
 
     assert len(results) == 1
     assert progress_path.exists()
+    if suffix == ".csv":
+        # Header plus one appended row per listing.
+        lines = progress_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == len(results) + 1
     assert main_page.closed is True
+    assert [pattern for pattern, _ in context.routes] == [scraper._BLOCKED_URL_RE]
+
+
+@pytest.mark.asyncio
+async def test_scrape_pages_skips_ids_stored_in_progress_file(monkeypatch, tmp_path):
+    progress_path = tmp_path / "progress.xlsx"
+    write_listings_to_excel(
+        [Listing(title="Alt", url="https://example.com/anzeige/111", listing_id="111")],
+        progress_path,
+    )
+    context = DummyContext([DummyPage([], next_visible=False)])
+    detail_calls = []
+
+    monkeypatch.setattr(scraper, "wait_for_page_ready", _noop)
+    monkeypatch.setattr(scraper, "handle_intro_dialogs", _noop)
+
+    async def fake_parse_listings(page):  # noqa: ARG001
+        return [Listing(title="Alt", url="https://example.com/anzeige/111")]
+
+    async def fake_populate(page, listing, known_listing_ids):  # noqa: ARG001
+        detail_calls.append(listing.title)
+        return True
+
+    monkeypatch.setattr(scraper, "parse_listings", fake_parse_listings)
+    monkeypatch.setattr(scraper, "_populate_listing", fake_populate)
+
+    results = await scraper.scrape_pages(
+        context,
+        "https://start",
+        max_pages=1,
+        concurrency_limit=1,
+        progress_path=progress_path,
+    )
+
+    assert results == []
+    assert detail_calls == []
+
+
+@pytest.mark.asyncio
+async def test_scrape_pages_overlaps_detail_fetches(monkeypatch):
+    main_page = DummyPage([], next_visible=False)
+    context = DummyContext([main_page])
+    listings = [Listing(title=f"Ad{i}", url=f"https://example.com/{i}") for i in range(8)]
+    in_flight = 0
+    peak = 0
+    used_pages = set()
+
+    monkeypatch.setattr(scraper, "wait_for_page_ready", _noop)
+    monkeypatch.setattr(scraper, "handle_intro_dialogs", _noop)
+
+    async def fake_parse_listings(page):  # noqa: ARG001
+        return listings
+
+    async def fake_populate(page, listing, known_listing_ids):  # noqa: ARG001
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        used_pages.add(id(page))
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return True
+
+    monkeypatch.setattr(scraper, "parse_listings", fake_parse_listings)
+    monkeypatch.setattr(scraper, "_populate_listing", fake_populate)
+
+    results = await scraper.scrape_pages(
+        context, "https://start", max_pages=1, concurrency_limit=4
+    )
+
+    assert results == listings
+    # Four pooled detail pages are opened once and kept busy in parallel.
+    assert peak == 4
+    assert len(used_pages) == 4
+    assert len(context.created) == 5
+    assert all(page.closed for page in context.created)
+
+
+@pytest.mark.asyncio
+async def test_scrape_pages_advances_while_populating(monkeypatch):
+    main_page = DummyPage([], next_visible=True)
+    context = DummyContext([main_page])
+    events = []
+    pages = iter(
+        [
+            [Listing(title="Ad1", url="https://example.com/1")],
+            [Listing(title="Ad2", url="https://example.com/2")],
+        ]
+    )
+
+    monkeypatch.setattr(scraper, "wait_for_page_ready", _noop)
+    monkeypatch.setattr(scraper, "handle_intro_dialogs", _noop)
+
+    async def fake_parse_listings(page):
+        return next(pages)
+
+    async def fake_populate(page, listing, known_listing_ids):  # noqa: ARG001
+        await asyncio.sleep(0.01)
+        events.append((listing.title, main_page.clicks))
+        return True
+
+    monkeypatch.setattr(scraper, "parse_listings", fake_parse_listings)
+    monkeypatch.setattr(scraper, "_populate_listing", fake_populate)
+
+    results = await scraper.scrape_pages(
+        context, "https://start", max_pages=2, concurrency_limit=1
+    )
+
+    assert [listing.title for listing in results] == ["Ad1", "Ad2"]
+    # The next page was requested while the first page was still populating,
+    # and the last page does not click any further.
+    assert events == [("Ad1", 1), ("Ad2", 1)]
+    assert main_page.clicks == 1
+
+
+@pytest.mark.asyncio
+async def test_scrape_pages_batches_excel_progress(monkeypatch, tmp_path):
+    main_page = DummyPage([], next_visible=True)
+    context = DummyContext([main_page])
+    pages = iter(
+        [
+            [Listing(title="Ad1", url="https://example.com/1", listing_id="1")],
+            [Listing(title="Ad2", url="https://example.com/2", listing_id="2")],
+        ]
+    )
+    writes = []
+
+    monkeypatch.setattr(scraper, "wait_for_page_ready", _noop)
+    monkeypatch.setattr(scraper, "handle_intro_dialogs", _noop)
+
+    async def fake_parse_listings(page):
+        return next(pages)
+
+    async def fake_populate(page, listing, known_listing_ids):  # noqa: ARG001
+        return True
+
+    monkeypatch.setattr(scraper, "parse_listings", fake_parse_listings)
+    monkeypatch.setattr(scraper, "_populate_listing", fake_populate)
+    monkeypatch.setattr(
+        scraper,
+        "write_listings_to_excel",
+        lambda listings, path: writes.append([l.title for l in listings]),
+    )
+
+    await scraper.scrape_pages(
+        context,
+        "https://start",
+        max_pages=2,
+        concurrency_limit=1,
+        progress_path=tmp_path / "progress.xlsx",
+    )
+
+    assert writes == [["Ad1", "Ad2"]]
 
 
 @pytest.mark.asyncio
@@ -121,9 +401,10 @@ async def test_scrape_pages_stops_without_results(monkeypatch, tmp_path):
     main_page = DummyPage([], next_visible=False)
     context = DummyContext([main_page])
 
-    monkeypatch.setattr(scraper, "wait_for_page_ready", lambda page, delay=0: asyncio.sleep(0))
-    monkeypatch.setattr(scraper, "accept_cookies", lambda page: asyncio.sleep(0))
-    monkeypatch.setattr(scraper, "confirm_age", lambda page: asyncio.sleep(0))
+    # The dump is written to the working directory.
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, "wait_for_page_ready", _noop)
+    monkeypatch.setattr(scraper, "handle_intro_dialogs", _noop)
 
     async def fake_parse_listings(page):
         return []
@@ -140,6 +421,119 @@ async def test_scrape_pages_stops_without_results(monkeypatch, tmp_path):
     )
 
     assert results == []
-    dump_path = Path("dump_page_1.html")
-    assert dump_path.exists()
-    dump_path.unlink()
+    assert (tmp_path / "dump_page_1.html").read_text(encoding="utf-8") == "<html></html>"
+
+
+@pytest.mark.asyncio
+async def test_open_detail_contexts_shares_storage_state():
+    class PoolBrowser:
+        def __init__(self):
+            self.states = []
+
+        async def new_context(self, storage_state=None):
+            self.states.append(storage_state)
+            return DummyContext([], browser=self)
+
+    class MainContext(DummyContext):
+        def __init__(self, browser):
+            super().__init__([])
+            self.browser = browser
+
+        async def storage_state(self):
+            return {"cookies": ["consent"]}
+
+    browser = PoolBrowser()
+    main_context = MainContext(browser)
+
+    pool = await scraper.open_detail_contexts(main_context, 3)
+    assert pool[0] is main_context
+    assert len(pool) == 3
+    assert browser.states == [{"cookies": ["consent"]}] * 2
+    assert all(len(sibling.routes) == 1 for sibling in pool[1:])
+
+    context = DummyContext([])
+    assert await scraper.open_detail_contexts(context, 3) == [context] * 3
+    assert len(await scraper.open_detail_contexts(main_context, 1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_block_heavy_resources_routes_each_context_once():
+    context = DummyContext([], browser=object())
+
+    await scraper._block_heavy_resources(context)
+    await scraper._block_heavy_resources(context)
+    assert len(context.routes) == 1
+
+    other = DummyContext([], browser=object())
+    await scraper._block_heavy_resources(other)
+    assert len(other.routes) == 1
+
+    # Persistent profiles keep their HTTP cache and are not routed.
+    persistent = DummyContext([])
+    await scraper._block_heavy_resources(persistent)
+    assert persistent.routes == []
+
+
+def test_blocked_url_pattern_matches_file_extensions():
+    pattern = scraper._BLOCKED_URL_RE
+
+    assert pattern.search("https://cdn.example.com/a/b.JPG")
+    assert pattern.search("https://cdn.example.com/font.woff2?v=3")
+    assert not pattern.search("https://www.markt.de/anzeige/123/")
+    assert not pattern.search("https://www.markt.de/app.js")
+    assert not pattern.search("https://www.markt.de/png-anzeigen/")
+
+
+@pytest.mark.asyncio
+async def test_abort_heavy_resources_keeps_documents():
+    class FakeRoute:
+        def __init__(self, resource_type):
+            self.request = SimpleNamespace(resource_type=resource_type)
+            self.action = None
+
+        async def abort(self):
+            self.action = "abort"
+
+        async def continue_(self):
+            self.action = "continue"
+
+    routes = {kind: FakeRoute(kind) for kind in ("image", "font", "document", "xhr")}
+    for route in routes.values():
+        await scraper._abort_heavy_resources(route)
+
+    assert {kind: route.action for kind, route in routes.items()} == {
+        "image": "abort",
+        "font": "abort",
+        "document": "continue",
+        "xhr": "continue",
+    }
+
+
+@pytest.mark.asyncio
+async def test_advance_to_next_page_without_button(monkeypatch):
+    page = DummyPage([], next_visible=True)
+
+    async def no_button():
+        return 0
+
+    page.count = no_button
+    monkeypatch.setattr(scraper, "wait_for_page_ready", _noop)
+
+    assert await scraper._advance_to_next_page(page) is False
+    assert page.clicks == 0
+    del page.count
+    assert await scraper._advance_to_next_page(page) is True
+    assert page.clicks == 1
+
+
+def test_is_known_listing_matches_url_tokens():
+    known = {"12345678", "ab-99"}
+
+    assert scraper._is_known_listing(Listing(title="A", url="https://x/anzeige/12345678/"), known)
+    assert scraper._is_known_listing(Listing(title="B", url="https://x/a/ab-99?x=1"), known)
+    assert scraper._is_known_listing(Listing(title="C", url="https://x/slug-12345678"), known)
+    # IDs inside a longer token are still found by the substring fallback.
+    assert scraper._is_known_listing(Listing(title="F", url="https://x/anzeige_12345678"), known)
+    assert scraper._is_known_listing(Listing(title="G", url="https://x/?id=ab-99x"), known)
+    assert not scraper._is_known_listing(Listing(title="D", url="https://x/anzeige/1234567/"), known)
+    assert not scraper._is_known_listing(Listing(title="E", url="https://x/anzeige/12345678/"), set())